@@ -0,0 +1,28 @@
+import pytz
+from models import db
+from datetime import datetime
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+class CatalogVersion(db.Model):
+    __tablename__ = "catalog_version"
+
+    # Katalog resursi nomi (course, course_module, news ...)
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer(), nullable=False, default=0)
+
+    updated_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.version = 0
+    
+    @staticmethod
+    def to_dict(catalog_version):
+        _ = {
+            "name": catalog_version.name,
+            "version": catalog_version.version,
+            "updated_at": str(catalog_version.updated_at)
+        }
+        return _
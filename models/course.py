@@ -1,6 +1,8 @@
 import pytz
 from models import db
 from datetime import datetime
+from sqlalchemy.orm import deferred
+from utils.projection import fields_to_dict
 
 time_zone = pytz.timezone("Asia/Tashkent")
 
@@ -10,7 +12,8 @@ class Course(db.Model):
     id = db.Column(db.Integer(), primary_key=True)
 
     title = db.Column(db.String(200), nullable=False, unique=True)
-    description = db.Column(db.Text(), nullable=False)
+    # Katta Text ustunlar default yuklanmaydi (deferred), detail endpointlarda undefer qilinadi
+    description = deferred(db.Column(db.Text(), nullable=False))
     image_url = db.Column(db.Text(), nullable=False)
     level = db.Column(db.String(50), nullable=False)
     type_id = db.Column(db.Integer(), db.ForeignKey("type.id"), nullable=False)
@@ -27,7 +30,11 @@ class Course(db.Model):
         self.type_id = type_id
     
     @staticmethod
-    def to_dict(course):
+    def to_dict(course, fields=None):
+        # ?fields= berilganda faqat so'ralgan (load_only bilan yuklangan) maydonlar
+        if fields is not None:
+            return fields_to_dict(course, fields)
+
         _ = {
             "id": course.id,
             "title": course.title,
@@ -0,0 +1,47 @@
+import json
+import pytz
+from models import db
+from datetime import datetime
+
+time_zone = pytz.timezone("Asia/Tashkent")
+
+class ExamSession(db.Model):
+    __tablename__ = "exam_session"
+
+    id = db.Column(db.String(32), primary_key=True)
+
+    student_id = db.Column(db.Integer(), nullable=False)
+    # "lesson" yoki "module"
+    kind = db.Column(db.String(10), nullable=False)
+    parent_id = db.Column(db.Integer(), nullable=False)
+    # Berilgan savollar va to'g'ri javoblar (JSON): [[question_id, correct_option], ...]
+    answer_key_json = db.Column(db.Text(), nullable=False)
+    # Unix vaqt (soniya) - workerlar orasida timezone farqisiz solishtiriladi
+    expires_at = db.Column(db.Float(), nullable=False, index=True)
+
+    created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
+
+    def __init__(self, id, student_id, kind, parent_id, answer_key, expires_at):
+        super().__init__()
+        self.id = id
+        self.student_id = student_id
+        self.kind = kind
+        self.parent_id = parent_id
+        self.answer_key_json = json.dumps([[question_id, correct_option] for question_id, correct_option in answer_key.items()])
+        self.expires_at = expires_at
+
+    def answer_key(self):
+        """{savol_id: correct_option}"""
+        return {question_id: correct_option for question_id, correct_option in json.loads(self.answer_key_json)}
+    
+    @staticmethod
+    def to_dict(exam_session):
+        _ = {
+            "id": exam_session.id,
+            "student_id": exam_session.student_id,
+            "kind": exam_session.kind,
+            "parent_id": exam_session.parent_id,
+            "expires_at": exam_session.expires_at,
+            "created_at": str(exam_session.created_at)
+        }
+        return _
@@ -1,6 +1,8 @@
 import pytz
 from models import db
 from datetime import datetime
+from utils.projection import fields_to_dict
+from sqlalchemy.orm import validates, deferred
 
 time_zone = pytz.timezone("Asia/Tashkent")
 
@@ -11,10 +13,12 @@ class Lesson(db.Model):
 
     course_module_id = db.Column(db.Integer(), db.ForeignKey("course_module.id"), nullable=False)
     title = db.Column(db.String(200), nullable=False, unique=True)
-    description = db.Column(db.Text(), nullable=False)
+    # Katta Text ustunlar default yuklanmaydi (deferred), detail endpointlarda undefer qilinadi
+    description = deferred(db.Column(db.Text(), nullable=False))
     video_url = db.Column(db.Text(), nullable=False)
-    content = db.Column(db.Text(), nullable=False)
+    content = deferred(db.Column(db.Text(), nullable=False))
     duration = db.Column(db.String(10), nullable=False)
+    duration_seconds = db.Column(db.Integer(), nullable=True)
     order = db.Column(db.Integer(), nullable=False)
     cover_url = db.Column(db.Text(), nullable=False)
     is_active = db.Column(db.Boolean(), default=True)
@@ -31,9 +35,27 @@ class Lesson(db.Model):
         self.duration = duration
         self.order = order
         self.cover_url = cover_url
+
+    @staticmethod
+    def parse_duration(duration):
+        """'MM:SS' ko'rinishidagi davomiylikni soniyaga o'giradi"""
+        try:
+            m, s = map(int, duration.split(":"))
+        except (AttributeError, ValueError):
+            return None
+        return m * 60 + s
+
+    @validates("duration")
+    def validate_duration(self, key, duration):
+        self.duration_seconds = Lesson.parse_duration(duration)
+        return duration
     
     @staticmethod
-    def to_dict(lesson):
+    def to_dict(lesson, fields=None):
+        # ?fields= berilganda faqat so'ralgan (load_only bilan yuklangan) maydonlar
+        if fields is not None:
+            return fields_to_dict(lesson, fields)
+
         _ = {
             "id": lesson.id,
             "course_module_id": lesson.course_module_id,
@@ -42,6 +64,7 @@ class Lesson(db.Model):
             "video_url": lesson.video_url,
             "content": lesson.content,
             "duration": lesson.duration,
+            "duration_seconds": lesson.duration_seconds,
             "order": lesson.order,
             "cover_url": lesson.cover_url,
             "is_active": lesson.is_active,
@@ -1,6 +1,8 @@
 import pytz
 from models import db
 from datetime import datetime
+from sqlalchemy.orm import deferred
+from utils.projection import fields_to_dict
 
 time_zone = pytz.timezone("Asia/Tashkent")
 
@@ -11,7 +13,8 @@ class News(db.Model):
 
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text(), nullable=False)
-    content = db.Column(db.Text(), nullable=False)
+    # Yangilik matni default yuklanmaydi (deferred), detail endpointlarda undefer qilinadi
+    content = deferred(db.Column(db.Text(), nullable=False))
     file_url = db.Column(db.Text(), nullable=False)
     image_url = db.Column(db.Text(), nullable=False)
 
@@ -26,7 +29,11 @@ class News(db.Model):
         self.image_url = image_url
     
     @staticmethod
-    def to_dict(news):
+    def to_dict(news, fields=None):
+        # ?fields= berilganda faqat so'ralgan (load_only bilan yuklangan) maydonlar
+        if fields is not None:
+            return fields_to_dict(news, fields)
+
         _ = {
             "id": news.id,
             "title": news.title,
@@ -6,6 +6,10 @@ time_zone = pytz.timezone("Asia/Tashkent")
 
 class SupportMessage(db.Model):
     __tablename__ = "support_message"
+    __table_args__ = (
+        # Xabarlar tarixini sahifalash uchun
+        db.Index("ix_support_message_ticket_id_created_at", "ticket_id", "created_at"),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
 
@@ -14,6 +18,7 @@ class SupportMessage(db.Model):
     sender_role = db.Column(db.String(50), nullable=False)
     message = db.Column(db.Text(), nullable=False)
     file_path = db.Column(db.Text(), nullable=True)
+    # Eski maydon: o'qilganlik endi ticketdagi *_read_up_to orqali aniqlanadi
     is_read = db.Column(db.Boolean, default=False)
     
     created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
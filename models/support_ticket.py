@@ -11,6 +11,16 @@ class SupportTicket(db.Model):
 
     student_id = db.Column(db.Integer(), db.ForeignKey("user.id"), nullable=False)
     status = db.Column(db.String(50), nullable=False)
+
+    # Inbox uchun denormalizatsiya qilingan maydonlar
+    unread_for_support = db.Column(db.Integer(), nullable=False, default=0)
+    unread_for_student = db.Column(db.Integer(), nullable=False, default=0)
+    last_message_id = db.Column(db.Integer(), nullable=True)
+    last_message_at = db.Column(db.DateTime(), nullable=True, index=True)
+
+    # O'qilgan xabarlar chegarasi (shu ID gacha bo'lgan qarshi tomon xabarlari o'qilgan)
+    support_read_up_to = db.Column(db.Integer(), nullable=False, default=0)
+    student_read_up_to = db.Column(db.Integer(), nullable=False, default=0)
     
     created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
     updated_at = db.Column(db.DateTime())
@@ -19,6 +29,10 @@ class SupportTicket(db.Model):
         super().__init__()
         self.student_id = student_id
         self.status = status
+        self.unread_for_support = 0
+        self.unread_for_student = 0
+        self.support_read_up_to = 0
+        self.student_read_up_to = 0
     
     @staticmethod
     def to_dict(support_ticket):
@@ -26,6 +40,12 @@ class SupportTicket(db.Model):
             "id": support_ticket.id,
             "student_id": support_ticket.student_id,
             "status": support_ticket.status,
+            "unread_for_support": support_ticket.unread_for_support,
+            "unread_for_student": support_ticket.unread_for_student,
+            "last_message_id": support_ticket.last_message_id,
+            "last_message_at": str(support_ticket.last_message_at),
+            "support_read_up_to": support_ticket.support_read_up_to,
+            "student_read_up_to": support_ticket.student_read_up_to,
             "created_at": str(support_ticket.created_at),
             "updated_at": str(support_ticket.updated_at)
         }
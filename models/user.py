@@ -18,6 +18,8 @@ class User(db.Model):
     active_term = db.Column(db.Integer(), nullable=False)
     type_id = db.Column(db.Integer(), db.ForeignKey("type.id"), nullable=False)
     is_active = db.Column(db.Boolean(), default=True)
+    # Rol / aktivlik o'zgarganda oshiriladi - eski tokenlar claimlari bilan ishlatilmaydi
+    token_version = db.Column(db.Integer(), nullable=False, default=0, server_default="0")
 
     created_at = db.Column(db.DateTime(), default=lambda: datetime.now(time_zone))
 
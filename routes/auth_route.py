@@ -1,6 +1,7 @@
 from flask import Blueprint
 from models.user import User
-from utils.utils import get_response
+from utils.utils import get_response, output_json
+from utils.identity import identity_claims
 from flask_bcrypt import check_password_hash
 from flask_restful import Api, Resource, reqparse
 from flask_jwt_extended import create_access_token
@@ -11,6 +12,7 @@ auth_parse.add_argument("password", type=str, required=True, help="Password cann
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/api/auth")
 api = Api(auth_bp)
+api.representations["application/json"] = output_json
 
 class AuthResource(Resource):
 
@@ -51,7 +53,7 @@ class AuthResource(Resource):
         if not check_password_hash(user.password, password):
             return get_response("Username or Password is incorrect", None, 404), 404
         
-        access_token = create_access_token(identity=user.username)
+        access_token = create_access_token(identity=user.username, additional_claims=identity_claims(user))
         result_data = {
             "full_name": user.full_name,
             "user_id": user.id,
@@ -1,6 +1,7 @@
 from random import randint
 from flask import Blueprint
-from utils.utils import get_response
+from sqlalchemy.orm import undefer
+from utils.utils import get_response, output_json
 from flask_restful import Api, Resource
 from utils.decorators import role_required
 
@@ -11,6 +12,7 @@ from models.module_test_progress import ModuleTestProgress
 
 certificate_bp = Blueprint("certificate", __name__, url_prefix="/api/certificate")
 api = Api(certificate_bp)
+api.representations["application/json"] = output_json
 
 class CertificateResource(Resource):
 
@@ -46,7 +48,7 @@ class CertificateResource(Resource):
                 description: Course not found or Student not found or Module Test Progress not found
         """
 
-        found_course = Course.query.filter_by(id=course_id).first()
+        found_course = Course.query.options(undefer("*")).filter_by(id=course_id).first()
         if not found_course:
             return get_response("Course not found", None, 404), 404
         
@@ -1,8 +1,10 @@
 from models import db
 from flask import Blueprint
 from models.course import Course
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.catalog_cache import catalog_cache
 from models.course_content import CourseContent
 from flask_restful import Api, Resource, reqparse
 
@@ -19,10 +21,12 @@ course_content_update_parse.add_argument("content_url", type=str)
 
 course_content_bp = Blueprint("course_content", __name__, url_prefix="/api/course_content")
 api = Api(course_content_bp)
+api.representations["application/json"] = output_json
 
 class CourseContentResource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("course_content")
     def get(self, course_content_id):
         """Course Content Get API
         Path - /api/course_content/<course_content_id>
@@ -83,6 +87,7 @@ class CourseContentResource(Resource):
             return get_response("Course Content not found", None, 404), 404
 
         db.session.delete(course_content)
+        bump_catalog_version("course_content")
         db.session.commit()
         return get_response("Successfully deleted course content", None, 200), 200
 
@@ -145,12 +150,14 @@ class CourseContentResource(Resource):
         if content_url is not None:
             found_course_content.content_url = content_url
 
+        bump_catalog_version("course_content")
         db.session.commit()
         return get_response("Successfully updated course content", None, 200), 200
 
 class CourseContentListCreateResource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("course_content", "course")
     def get(self, course_id):
         """Course Content List API
         Path - /api/course_content/course/<course_id>
@@ -176,13 +183,11 @@ class CourseContentListCreateResource(Resource):
             404:
                 description: Course not found
         """
-        found_course = Course.query.filter_by(id=course_id).first()
-        if not found_course:
+        course_tree = catalog_cache.get_course_tree(course_id)
+        if not course_tree:
             return get_response("Course not found", None, 404), 404
 
-        course_content_list = CourseContent.query.filter_by(course_id=found_course.id).order_by(CourseContent.created_at.desc()).all()
-        result_course_content_list = [CourseContent.to_dict(course_content) for course_content in course_content_list]
-        return get_response("Course Content List", result_course_content_list, 200), 200
+        return get_response("Course Content List", course_tree["contents"], 200), 200
 
     @role_required(["ADMIN"])
     def post(self, course_id):
@@ -240,6 +245,7 @@ class CourseContentListCreateResource(Resource):
         
         new_course_content = CourseContent(found_course.id, title, description, content_url)
         db.session.add(new_course_content)
+        bump_catalog_version("course_content")
         db.session.commit()
         return get_response("Successfully created course content", new_course_content.id, 200), 200
 
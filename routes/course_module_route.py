@@ -1,8 +1,10 @@
 from models import db
 from flask import Blueprint
 from models.course import Course
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.catalog_cache import catalog_cache
 from models.course_module import CourseModule
 from flask_restful import Api, Resource, reqparse
 
@@ -20,10 +22,12 @@ course_module_update_parse.add_argument("is_active", type=bool)
 
 course_module_bp = Blueprint("course_module", __name__, url_prefix="/api/course_module")
 api = Api(course_module_bp)
+api.representations["application/json"] = output_json
 
 class CourseModuleResource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("course_module")
     def get(self, course_module_id):
         """Course Module Get API
         Path - /api/course_module/<course_module_id>
@@ -84,6 +88,7 @@ class CourseModuleResource(Resource):
             return get_response("Course Module Not found", None, 404), 404
 
         db.session.delete(course_module)
+        bump_catalog_version("course_module")
         db.session.commit()
         return get_response("Successfully deleted course module", None, 200), 200
 
@@ -151,12 +156,14 @@ class CourseModuleResource(Resource):
         if is_active is not None:
             found_course_module.is_active = is_active
 
+        bump_catalog_version("course_module")
         db.session.commit()
         return get_response("Successfully updated course module", None, 200), 200
 
 class CourseModuleListCreateResource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("course_module", "course")
     def get(self, course_id):
         """Course Module List API
         Path - /api/course_module/course/<course_id>
@@ -182,13 +189,11 @@ class CourseModuleListCreateResource(Resource):
             404:
                 description: Course not found
         """
-        found_course = Course.query.filter_by(id=course_id).first()
-        if not found_course:
+        course_tree = catalog_cache.get_course_tree(course_id)
+        if not course_tree:
             return get_response("Course not found", None, 404), 404
 
-        course_module_list = CourseModule.query.filter_by(course_id=found_course.id).order_by(CourseModule.order.asc()).all()
-        result_course_module_list = [CourseModule.to_dict(course_module) for course_module in course_module_list]
-        return get_response("Course Module List", result_course_module_list, 200), 200
+        return get_response("Course Module List", course_tree["modules"], 200), 200
 
     @role_required(["ADMIN"])
     def post(self, course_id):
@@ -246,6 +251,7 @@ class CourseModuleListCreateResource(Resource):
         
         new_course_module = CourseModule(found_course.id, title, description, order)
         db.session.add(new_course_module)
+        bump_catalog_version("course_module")
         db.session.commit()
         return get_response("Successfully created course module", new_course_module.id, 200), 200
 
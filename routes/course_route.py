@@ -1,10 +1,15 @@
 from models import db
+from sqlalchemy import func
 from flask import Blueprint
 from datetime import timedelta
 from models.lesson import Lesson
 from models.course import Course
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.catalog_cache import catalog_cache
+from utils.pagination import paginate_request, InvalidCursor
+from utils.projection import fields_request, load_fields, InvalidFields
 from models.course_module import CourseModule
 from models.course_content import CourseContent
 from flask_restful import Api, Resource, reqparse
@@ -26,10 +31,12 @@ course_update_parse.add_argument("is_active", type=bool)
 
 course_bp = Blueprint("course", __name__, url_prefix="/api/course")
 api = Api(course_bp)
+api.representations["application/json"] = output_json
 
 class CourseResource(Resource):
 
     @role_required(["ADMIN", "TEACHER", "STUDENT"])
+    @conditional_get("course")
     def get(self, course_id):
         """Course Get API
         Path - /api/course/<course_id>
@@ -54,11 +61,12 @@ class CourseResource(Resource):
             404:
                 description: Course not found
         """
-        course = Course.query.filter_by(id=course_id, is_active=True).first()
-        if not course:
+        # Kurs katalog cache dagi daraxtdan olinadi (steady state da DB ga so'rov yo'q)
+        course_tree = catalog_cache.get_course_tree(course_id)
+        if not course_tree or not course_tree["course"]["is_active"]:
             return get_response("Course not found", None, 404), 404
         
-        return get_response("Course successfully found", Course.to_dict(course), 200), 200
+        return get_response("Course successfully found", course_tree["course"], 200), 200
 
     @role_required(["ADMIN"])
     def delete(self, course_id):
@@ -90,6 +98,7 @@ class CourseResource(Resource):
             return get_response("Course not found", None, 404), 404
 
         db.session.delete(course)
+        bump_catalog_version("course")
         db.session.commit()
         return get_response("Successfully deleted course", None, 200), 200
 
@@ -162,12 +171,14 @@ class CourseResource(Resource):
         if is_active is not None:
             found_course.is_active = is_active
 
+        bump_catalog_version("course")
         db.session.commit()
         return get_response("Successfully updated course", None, 200), 200
 
 class CourseListCreateResource(Resource):
 
     @role_required(["ADMIN", "TEACHER", "STUDENT"])
+    @conditional_get("course")
     def get(self):
         """Course List API
         Path - /api/course
@@ -181,13 +192,42 @@ class CourseListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size (default 50, max 200)
+
+            - name: after
+              in: query
+              type: string
+              required: false
+              description: Cursor from previous page (next_cursor)
+
+            - name: fields
+              in: query
+              type: string
+              required: false
+              description: Faqat kerakli maydonlar, vergul bilan (masalan id,title,order)
+
         responses:
             200:
                 description: Return Course List
+            400:
+                description: (Invalid cursor) or (Invalid fields)
         """
-        course_list = Course.query.filter_by().order_by(Course.created_at.desc()).all()
-        result_course_list = [Course.to_dict(course) for course in course_list]
-        return get_response("Course List", result_course_list, 200), 200
+        try:
+            field_list = fields_request(Course)
+        except InvalidFields:
+            return get_response("Invalid fields", None, 400), 400
+
+        try:
+            course_list, next_cursor = paginate_request(load_fields(Course.query.filter_by(), Course, field_list, ["id", "created_at"]), Course)
+        except InvalidCursor:
+            return get_response("Invalid cursor", None, 400), 400
+
+        result_course_list = [Course.to_dict(course, field_list) for course in course_list]
+        return get_response("Course List", result_course_list, 200, next_cursor), 200
 
     @role_required(["ADMIN"])
     def post(self):
@@ -239,6 +279,7 @@ class CourseListCreateResource(Resource):
         
         new_course = Course(title, description, image_url, level, type_id)
         db.session.add(new_course)
+        bump_catalog_version("course")
         db.session.commit()
         return get_response("Successfully created course", new_course.id, 200), 200
 
@@ -269,30 +310,91 @@ class CourseCountsResource(Resource):
             404:
                 description: Course not found
         """
-        found_course = Course.query.filter_by(id=course_id, is_active=True).first()
-        if not found_course:
+        active_lesson_query = (
+            db.session.query(Lesson)
+            .join(CourseModule, CourseModule.id == Lesson.course_module_id)
+            .filter(
+                CourseModule.course_id == Course.id,
+                CourseModule.is_active == True,
+                Lesson.is_active == True
+            )
+        )
+
+        # Barcha sonlar bitta query bilan hisoblanadi
+        counts = db.session.query(
+            db.session.query(func.count(CourseModule.id))
+                .filter(CourseModule.course_id == Course.id, CourseModule.is_active == True)
+                .scalar_subquery(),
+            db.session.query(func.count(CourseContent.id))
+                .filter(CourseContent.course_id == Course.id)
+                .scalar_subquery(),
+            active_lesson_query.with_entities(func.count(Lesson.id)).scalar_subquery(),
+            active_lesson_query.with_entities(func.coalesce(func.sum(Lesson.duration_seconds), 0)).scalar_subquery()
+        ).filter(Course.id == course_id, Course.is_active == True).first()
+
+        if not counts:
             return get_response("Course not found", None, 404), 404
-        
-        lesson_count = 0
-        total_duration = timedelta()
-        course_module_list = CourseModule.query.filter_by(course_id=found_course.id, is_active=True).all()
-        course_content_list = CourseContent.query.filter_by(course_id=found_course.id).all()
-
-        for course_module in course_module_list:
-            lesson_list = Lesson.query.filter_by(course_module_id=course_module.id, is_active=True).all()
-            for lesson in lesson_list:
-                m, s = map(int, lesson.duration.split(":"))
-                total_duration += timedelta(minutes=m, seconds=s)
-            lesson_count += len(lesson_list)
+
+        course_module_count, course_content_count, lesson_count, lesson_total_seconds = counts
+        total_duration = timedelta(seconds=int(lesson_total_seconds))
 
         result = {
-            "course_module_count": len(course_module_list),
-            "course_content_count": len(course_content_list),
+            "course_module_count": course_module_count,
+            "course_content_count": course_content_count,
             "lesson_count": lesson_count,
             "lesson_total_duration": str(total_duration)
         }
         return get_response("Course counts successfully found", result, 200), 200
 
+class CourseTreeResource(Resource):
+
+    @role_required(["ADMIN"])
+    @conditional_get("course", "course_module", "course_content", "lesson", "lesson_material")
+    def get(self, course_id):
+        """Course Tree Get API
+        Path - /api/course/tree/<course_id>
+        Method - GET
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: course_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Course ID
+        responses:
+            200:
+                description: Return a Course with modules, lessons (without description and content), materials and contents
+            404:
+                description: Course not found
+        """
+        course_tree = catalog_cache.get_course_tree(course_id)
+        if not course_tree:
+            return get_response("Course not found", None, 404), 404
+
+        # Cache dagi dict lar o'zgartirilmaydi - daraxt yangi dict larda yig'iladi
+        result_course_module_list = []
+        for course_module in course_tree["modules"]:
+            result_lesson_list = [
+                {**lesson, "materials": course_tree["materials"].get(lesson["id"], [])}
+                for lesson in course_tree["lessons"].get(course_module["id"], [])
+            ]
+            result_course_module_list.append({**course_module, "lessons": result_lesson_list})
+
+        result = {
+            **course_tree["course"],
+            "modules": result_course_module_list,
+            "contents": course_tree["contents"]
+        }
+        return get_response("Course tree successfully found", result, 200), 200
+
 api.add_resource(CourseResource, "/<course_id>")
 api.add_resource(CourseListCreateResource, "/")
 api.add_resource(CourseCountsResource, "/counts/<course_id>")
+api.add_resource(CourseTreeResource, "/tree/<course_id>")
@@ -1,8 +1,9 @@
 from models import db
 from flask import Blueprint
+from sqlalchemy.orm import undefer
 from models.user import User
 from models.course import Course
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from models.course_save import CourseSave
 from utils.decorators import role_required
 from flask_restful import Api, Resource, reqparse
@@ -12,6 +13,7 @@ course_save_parse.add_argument("course_id", type=int, required=True, help="Cours
 
 course_save_bp = Blueprint("course_save", __name__, url_prefix="/api/course_save")
 api = Api(course_save_bp)
+api.representations["application/json"] = output_json
 
 class CourseSaveResource(Resource):
     decorators = [role_required(["ADMIN", "STUDENT"])]
@@ -44,15 +46,14 @@ class CourseSaveResource(Resource):
         if not found_user:
             return get_response("User not found", None, 404), 404
 
-        course_list = []
-        course_save_list = CourseSave.query.filter_by(user_id=found_user.id).all()
-
-        for course_save in course_save_list:
-            course = Course.query.filter_by(id=course_save.course_id).first()
-            if not course:
-                continue
-            else:
-                course_list.append(course)
+        # Saqlangan kurslar bitta query bilan (to'liq to_dict uchun deferred ustunlar ham)
+        course_list = (
+            Course.query.options(undefer("*"))
+            .join(CourseSave, CourseSave.course_id == Course.id)
+            .filter(CourseSave.user_id == found_user.id)
+            .order_by(CourseSave.id.asc())
+            .all()
+        )
 
         result_course_list = [Course.to_dict(course) for course in course_list]
         res = {
@@ -1,8 +1,10 @@
 from models import db
 from flask import Blueprint
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from models.language import Language
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.pagination import paginate_request, InvalidCursor
 from flask_restful import Api, Resource, reqparse
 
 language_create_parse = reqparse.RequestParser()
@@ -17,10 +19,12 @@ language_update_parse.add_argument("message", type=str)
 
 language_bp = Blueprint("language", __name__, url_prefix="/api/language")
 api = Api(language_bp)
+api.representations["application/json"] = output_json
 
 class LanguageResource(Resource):
     decorators = [role_required("ADMIN")]
     
+    @conditional_get("language")
     def get(self, language_id):
         """Language Get API
         Path - /api/language/<language_id>
@@ -80,6 +84,7 @@ class LanguageResource(Resource):
             return get_response("Language not found", None, 404), 404
         
         db.session.delete(language)
+        bump_catalog_version("language")
         db.session.commit()
         return get_response("Successfully deleted language", None, 200), 200
     
@@ -136,24 +141,42 @@ class LanguageResource(Resource):
         if message is not None:
             found_language.message = message
        
+        bump_catalog_version("language")
         db.session.commit()
         return get_response("Successfully updated language", None, 200), 200
 
 class LanguageListCreateResource(Resource):
 
+    @conditional_get("language")
     def get(self):
         """Language List API
         Path - /api/language
         Method - GET
         ---
         consumes: application/json
+        parameters:
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size (default 50, max 200)
+
+            - name: after
+              in: query
+              type: string
+              required: false
+              description: Cursor from previous page (next_cursor)
         responses:
             200:
                 description: Return Language List
         """
-        language_list = Language.query.filter_by().order_by(Language.created_at.desc()).all()
+        try:
+            language_list, next_cursor = paginate_request(Language.query.filter_by(), Language)
+        except InvalidCursor:
+            return get_response("Invalid cursor", None, 400), 400
+
         result_language_list = [Language.to_dict(language) for language in language_list]
-        return get_response("Language List", result_language_list, 200), 200
+        return get_response("Language List", result_language_list, 200, next_cursor), 200
     
     @role_required("ADMIN")
     def post(self):
@@ -195,11 +218,13 @@ class LanguageListCreateResource(Resource):
         
         new_language = Language(lang, code, message)
         db.session.add(new_language)
+        bump_catalog_version("language")
         db.session.commit()
         return get_response("Successfully created language", new_language.id, 200), 200
 
 class LanguageGetResource(Resource):
     
+    @conditional_get("language")
     def get(self, lang, code):
         """Language User Get API
         Path - /api/language/user/<lang>/<code>
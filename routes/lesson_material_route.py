@@ -1,8 +1,10 @@
 from models import db
 from flask import Blueprint
 from models.lesson import Lesson
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.catalog_cache import catalog_cache, to_catalog_id
 from models.lesson_material import LessonMaterial
 from flask_restful import Api, Resource, reqparse
 
@@ -19,10 +21,12 @@ lesson_material_update_parse.add_argument("material_url", type=str)
 
 lesson_material_bp = Blueprint("lesson_material", __name__, url_prefix="/api/lesson_material")
 api = Api(lesson_material_bp)
+api.representations["application/json"] = output_json
 
 class LessonMaterialResource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("lesson_material")
     def get(self, lesson_material_id):
         """Lesson Material Get API
         Path - /api/lesson_material/<lesson_material_id>
@@ -83,6 +87,7 @@ class LessonMaterialResource(Resource):
             return get_response("Lesson Material not found", None, 404), 404
 
         db.session.delete(lesson_material)
+        bump_catalog_version("lesson_material")
         db.session.commit()
         return get_response("Successfully deleted lesson material", None, 200), 200
 
@@ -145,12 +150,14 @@ class LessonMaterialResource(Resource):
         if material_url is not None:
             found_lesson_material.material_url = material_url
 
+        bump_catalog_version("lesson_material")
         db.session.commit()
         return get_response("Successfully updated lesson material", None, 200), 200
 
 class LessonMaterialListCreateResource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("lesson_material", "lesson")
     def get(self, lesson_id):
         """Lesson Material List API
         Path - /api/lesson_material/lesson/<lesson_id>
@@ -176,13 +183,17 @@ class LessonMaterialListCreateResource(Resource):
             404:
                 description: Lesson not found
         """
-        found_lesson = Lesson.query.filter_by(id=lesson_id).first()
-        if not found_lesson:
+        # Materiallar dars tegishli kursning katalog cache dagi daraxtidan olinadi
+        course_tree = None
+        course_id = catalog_cache.get_lesson_course_id(lesson_id)
+        if course_id is not None:
+            course_tree = catalog_cache.get_course_tree(course_id)
+
+        lesson_material_list = course_tree["materials"].get(to_catalog_id(lesson_id)) if course_tree else None
+        if lesson_material_list is None:
             return get_response("Lesson not found", None, 404), 404
 
-        lesson_material_list = LessonMaterial.query.filter_by(lesson_id=found_lesson.id).order_by(LessonMaterial.created_at.desc()).all()
-        result_lesson_material_list = [LessonMaterial.to_dict(lesson_material) for lesson_material in lesson_material_list]
-        return get_response("Lesson Material List", result_lesson_material_list, 200), 200
+        return get_response("Lesson Material List", lesson_material_list, 200), 200
 
     @role_required(["ADMIN"])
     def post(self, lesson_id):
@@ -240,6 +251,7 @@ class LessonMaterialListCreateResource(Resource):
         
         new_lesson_material = LessonMaterial(found_lesson.id, title, description, material_url)
         db.session.add(new_lesson_material)
+        bump_catalog_version("lesson_material")
         db.session.commit()
         return get_response("Successfully created lesson material", new_lesson_material.id, 200), 200
 
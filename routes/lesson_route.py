@@ -1,10 +1,13 @@
 from models import db
 from datetime import date
-from flask import Blueprint
+from sqlalchemy.orm import undefer
+from flask import Blueprint, g
 from models.user import User
 from models.lesson import Lesson
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import bump_catalog_version
+from utils.projection import fields_request, load_fields, InvalidFields
 from models.course_module import CourseModule
 from models.lesson_student import LessonStudent
 from flask_jwt_extended import get_jwt_identity
@@ -34,6 +37,7 @@ lesson_update_parse.add_argument("is_active", type=bool)
 
 lesson_bp = Blueprint("lesson", __name__, url_prefix="/api/lesson")
 api = Api(lesson_bp)
+api.representations["application/json"] = output_json
 
 class LessonResource(Resource):
 
@@ -62,7 +66,7 @@ class LessonResource(Resource):
             404:
                 description: (Lesson not found) or (User not found)
         """
-        lesson = Lesson.query.filter_by(id=lesson_id, is_active=True).first()
+        lesson = Lesson.query.options(undefer("*")).filter_by(id=lesson_id, is_active=True).first()
         if not lesson:
             return get_response("Lesson not found", None, 404), 404
 
@@ -122,6 +126,7 @@ class LessonResource(Resource):
             return get_response("Lesson not found", None, 404), 404
 
         db.session.delete(lesson)
+        bump_catalog_version("lesson")
         db.session.commit()
         return get_response("Successfully deleted lesson", None, 200), 200
 
@@ -209,6 +214,7 @@ class LessonResource(Resource):
         if is_active is not None:
             found_lesson.is_active = is_active
 
+        bump_catalog_version("lesson")
         db.session.commit()
         return get_response("Successfully updated lesson", None, 200), 200
 
@@ -234,36 +240,61 @@ class LessonListCreateResource(Resource):
               required: true
               description: Enter Course Module ID
 
+            - name: fields
+              in: query
+              type: string
+              required: false
+              description: Faqat kerakli maydonlar, vergul bilan (masalan id,title,order)
+
         responses:
             200:
                 description: Return Lesson List
+            400:
+                description: Invalid fields
             404:
                 description: (Course Module not found) or (User not found)
         """
+        try:
+            field_list = fields_request(Lesson)
+        except InvalidFields:
+            return get_response("Invalid fields", None, 400), 400
+
         found_course_module = CourseModule.query.filter_by(id=course_module_id).first()
         if not found_course_module:
             return get_response("Course Module not found", None, 404), 404
 
-        lesson_list = Lesson.query.filter_by(course_module_id=found_course_module.id).order_by(Lesson.order.asc()).all()
+        identity = g.current_identity
+        if not identity["is_active"]:
+            return get_response("User not found", None, 404), 404
+
         result_lesson_list = []
 
-        username = get_jwt_identity()
-        found_user = User.query.filter_by(username=username, is_active=True).first()
-        if not found_user:
-            return get_response("User not found", None, 404), 404
+        # 6-moduldan boshlab 5-modul testi topshirilgan bo'lishi kerak (admin uchun emas)
+        if found_course_module.order >= 6 and identity["role"] != "ADMIN":
+            found_module = CourseModule.query.filter_by(order=5).first()
+            module_test_progress = None
+            if found_module:
+                module_test_progress = ModuleTestProgress.query.filter_by(student_id=identity["user_id"], module_id=found_module.id, is_completed=True).first()
+            if module_test_progress is None:
+                return get_response("Lesson List", result_lesson_list, 200), 200
+
+        lesson_query = load_fields(Lesson.query.filter_by(course_module_id=found_course_module.id), Lesson, field_list, ["id", "order"])
+        lesson_list = lesson_query.order_by(Lesson.order.asc()).all()
         
         today_date = date.today()
-        today_lesson_student = LessonStudent.query.filter_by(student_id=found_user.id, date=today_date).first()
+        today_lesson_student = LessonStudent.query.filter_by(student_id=identity["user_id"], date=today_date).first()
+
+        # Barcha darslar bo'yicha progress bitta query bilan (har dars uchun eng oxirgisi)
+        lesson_test_progress_map = {}
+        lesson_test_progress_list = LessonTestProgress.query.filter(
+            LessonTestProgress.student_id == identity["user_id"],
+            LessonTestProgress.lesson_id.in_([lesson.id for lesson in lesson_list])
+        ).order_by(LessonTestProgress.created_at.desc()).all()
+        for lesson_test_progress in lesson_test_progress_list:
+            lesson_test_progress_map.setdefault(lesson_test_progress.lesson_id, lesson_test_progress)
 
         for lesson in lesson_list:
-            if found_course_module.order >= 6:
-                found_module = CourseModule.query.filter_by(order=5).first()
-                module_test_progress = ModuleTestProgress.query.filter_by(student_id=found_user.id, module_id=found_module.id, is_completed=True).first()
-                if found_user.role != "ADMIN":
-                    if module_test_progress is None:
-                        continue
-
-            lesson_test_progress = LessonTestProgress.query.filter_by(student_id=found_user.id, lesson_id=lesson.id).order_by(LessonTestProgress.created_at.desc()).first()
+            lesson_test_progress = lesson_test_progress_map.get(lesson.id)
             
             if lesson_test_progress:
                 if today_lesson_student and lesson_test_progress.is_completed == False and lesson.order > 1:
@@ -272,7 +303,7 @@ class LessonListCreateResource(Resource):
                 if today_lesson_student and lesson.order > 1:
                     continue
 
-            dict_lesson = Lesson.to_dict(lesson)
+            dict_lesson = Lesson.to_dict(lesson, field_list)
 
             if not lesson_test_progress:
                 dict_lesson_test_progress = None
@@ -352,6 +383,7 @@ class LessonListCreateResource(Resource):
         
         new_lesson = Lesson(found_course_module.id, title, description, video_url, content, duration, order, cover_url)
         db.session.add(new_lesson)
+        bump_catalog_version("lesson")
         db.session.commit()
         return get_response("Successfully created lesson", new_lesson.id, 200), 200
 
@@ -1,12 +1,14 @@
-import random
 from models import db
 from datetime import date
-from flask import Blueprint
+from flask import Blueprint, g
 from models.user import User
 from models.lesson import Lesson
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from models.lesson_test import LessonTest
 from utils.decorators import role_required
+from utils.exam_session import exam_session_store
+from utils.conditional_get import bump_catalog_version
+from utils.grading import answer_key_cache, grade_answers, sample_questions
 from models.lesson_student import LessonStudent
 from flask_restful import Api, Resource, reqparse
 from models.lesson_test_progress import LessonTestProgress
@@ -32,8 +34,40 @@ lesson_test_update_parse.add_argument("correct_option", type=str)
 lesson_test_result_parse = reqparse.RequestParser()
 lesson_test_result_parse.add_argument("answer_list", type=list, location="json", required=True, help="Answer List cannot be blank")
 
+lesson_test_sample_parse = reqparse.RequestParser()
+lesson_test_sample_parse.add_argument("seed", type=str, location="args")
+
 lesson_test_bp = Blueprint("lesson_test", __name__, url_prefix="/api/lesson_test")
 api = Api(lesson_test_bp)
+api.representations["application/json"] = output_json
+
+def finish_lesson_test(student_id, found_lesson, correct_count):
+    """Lesson test natijasini progressga yozadi va keyingi darsni ochadi"""
+    progress = LessonTestProgress.query.filter_by(student_id=student_id, lesson_id=found_lesson.id).first()
+    if not progress:
+        progress = LessonTestProgress(student_id, found_lesson.id, False, 0)
+    
+    if progress.is_completed:
+        return None
+
+    progress.best_score = max(progress.best_score, correct_count)
+    if correct_count >= 7:
+        progress.is_completed = True
+        next_lesson = Lesson.query.filter(Lesson.order == found_lesson.order + 1).first()
+
+        if next_lesson:
+            found_progress = LessonTestProgress.query.filter_by(student_id=student_id, lesson_id=next_lesson.id, is_completed=False).first()
+            if not found_progress:
+                new_progress = LessonTestProgress(student_id, next_lesson.id, False, 0)
+                db.session.add(new_progress)
+                
+                today_date = date.today()
+                new_lesson_student = LessonStudent(student_id, today_date)
+                db.session.add(new_lesson_student)
+    
+    db.session.add(progress)
+    db.session.commit()
+    return None
 
 class LessonTestResource(Resource):
     decorators = [role_required(["ADMIN"])]
@@ -97,7 +131,9 @@ class LessonTestResource(Resource):
             return get_response("Lesson Test not found", None, 404), 404
 
         db.session.delete(lesson_test)
+        bump_catalog_version("lesson_test")
         db.session.commit()
+        answer_key_cache.invalidate(LessonTest, lesson_test.lesson_id)
         return get_response("Successfully deleted lesson test", None, 200), 200
 
     def patch(self, lesson_test_id):
@@ -149,6 +185,7 @@ class LessonTestResource(Resource):
         if not found_lesson_test:
             return get_response("Lesson Test not found", None, 404), 404
 
+        old_lesson_id = found_lesson_test.lesson_id
         data = lesson_test_update_parse.parse_args()
         lesson_id = data.get('lesson_id', None)
         question_text = data.get('question_text', None)
@@ -174,7 +211,10 @@ class LessonTestResource(Resource):
             correct_option = correct_option.upper()
             found_lesson_test.correct_option = correct_option
 
+        bump_catalog_version("lesson_test")
         db.session.commit()
+        answer_key_cache.invalidate(LessonTest, old_lesson_id)
+        answer_key_cache.invalidate(LessonTest, found_lesson_test.lesson_id)
         return get_response("Successfully updated lesson test", None, 200), 200
 
 class LessonTestListCreateResource(Resource):
@@ -277,7 +317,9 @@ class LessonTestListCreateResource(Resource):
         
         new_lesson_test = LessonTest(in_lesson_id, question_text, option_a, option_b, option_c, option_d, correct_option)
         db.session.add(new_lesson_test)
+        bump_catalog_version("lesson_test")
         db.session.commit()
+        answer_key_cache.invalidate(LessonTest, in_lesson_id)
         return get_response("Successfully created lesson test", new_lesson_test.id, 200), 200
 
 class LessonTestActionResource(Resource):
@@ -301,6 +343,12 @@ class LessonTestActionResource(Resource):
               type: integer
               required: true
               description: Enter Lesson ID
+
+            - name: seed
+              in: query
+              type: string
+              required: false
+              description: Random seed for a reproducible question set
         responses:
             200:
                 description: Return a Lesson Test
@@ -311,8 +359,10 @@ class LessonTestActionResource(Resource):
         if not found_lesson:
             return get_response("Lesson not found", None, 404), 404
         
-        lesson_test_list = LessonTest.query.filter_by(lesson_id=found_lesson.id).all()
-        lesson_test_random_list = random.sample(lesson_test_list, 10)
+        data = lesson_test_sample_parse.parse_args()
+        seed = data.get('seed', None)
+
+        lesson_test_random_list = sample_questions(LessonTest, LessonTest.lesson_id, found_lesson.id, 10, seed)
 
         result_lesson_test_random_list = [LessonTest.to_dict(lesson_test) for lesson_test in lesson_test_random_list]
         return get_response("Lesson Test successfully found", result_lesson_test_random_list, 200), 200
@@ -356,34 +406,24 @@ class LessonTestActionResource(Resource):
         data = lesson_test_result_parse.parse_args()
         answer_list = data['answer_list']
 
-        found_lesson = Lesson.query.filter_by(id=lesson_id).first()
-        if not found_lesson:
-            return get_response("Lesson not found", None, 404), 404
-    
         if not answer_list or not isinstance(answer_list, list):
             return get_response("Answer List must be a list", None, 400), 400
-    
-        correct_count = 0
-        for answer in answer_list:
-            if not isinstance(answer, dict):
-                continue
-            
-            lesson_test_id = answer.get('lesson_test_id')
-            result = answer.get('result')
 
-            if not lesson_test_id or not result:
-                continue
-            result = result.upper()
+        # Cache to'la bo'lsa DB ga umuman murojaat qilinmaydi
+        answer_key = answer_key_cache.get(LessonTest, LessonTest.lesson_id, lesson_id)
+        if not answer_key:
+            found_lesson = Lesson.query.filter_by(id=lesson_id).first()
+            if not found_lesson:
+                return get_response("Lesson not found", None, 404), 404
+    
+        correct_count, graded_answer_list = grade_answers(answer_list, 'lesson_test_id', answer_key)
 
-            lesson_test = LessonTest.query.filter_by(id=lesson_test_id, lesson_id=found_lesson.id).first()
-            if lesson_test and lesson_test.correct_option == result:
-                correct_count += 1
-            
         passed = correct_count >= 7
         result_test = {
             "total": len(answer_list),
             "correct_count": correct_count,
-            "passed": passed
+            "passed": passed,
+            "answer_list": graded_answer_list
         }
         
         return get_response("Lesson Test Result", result_test, 200), 200
@@ -435,35 +475,139 @@ class LessonTestFinishActionResource(Resource):
         if not found_lesson:
             return get_response("Lesson not found", None, 404), 404
         
-        progress = LessonTestProgress.query.filter_by(student_id=found_student.id, lesson_id=found_lesson.id).first()
-        if not progress:
-            progress = LessonTestProgress(found_student.id, found_lesson.id, False, 0)
-        
-        if progress.is_completed:
-            return get_response("Successfully Finish Lesson Test", None, 200), 200
-
-        correct_count = int(correct_count)
-        progress.best_score = max(progress.best_score, correct_count)
-        if correct_count >= 7:
-            progress.is_completed = True
-            next_lesson = Lesson.query.filter(Lesson.order == found_lesson.order + 1).first()
-
-            if next_lesson:
-                found_progress = LessonTestProgress.query.filter_by(student_id=found_student.id, lesson_id=next_lesson.id, is_completed=False).first()
-                if not found_progress:
-                    new_progress = LessonTestProgress(found_student.id, next_lesson.id, False, 0)
-                    db.session.add(new_progress)
-                    
-                    today_date = date.today()
-                    new_lesson_student = LessonStudent(found_student.id, today_date)
-                    db.session.add(new_lesson_student)
-        
-        db.session.add(progress)
+        finish_lesson_test(found_student.id, found_lesson, int(correct_count))
+        return get_response("Successfully Finish Lesson Test", None, 200), 200
+
+class LessonTestSessionResource(Resource):
+    decorators = [role_required(["STUDENT"])]
+
+    def post(self, lesson_id):
+        """Lesson Test Session Create API
+        Path - /api/lesson_test/session/<lesson_id>
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: lesson_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Lesson ID
+        responses:
+            200:
+                description: Return Exam Session ID and Lesson Test List (without correct options)
+            404:
+                description: (Lesson not found) or (Lesson Test not found)
+        """
+        found_lesson = Lesson.query.filter_by(id=lesson_id).first()
+        if not found_lesson:
+            return get_response("Lesson not found", None, 404), 404
+
+        lesson_test_random_list = sample_questions(LessonTest, LessonTest.lesson_id, found_lesson.id, 10)
+        if not lesson_test_random_list:
+            return get_response("Lesson Test not found", None, 404), 404
+
+        answer_key = {lesson_test.id: lesson_test.correct_option for lesson_test in lesson_test_random_list}
+
+        student_id = g.current_identity["user_id"]
+        session_id = exam_session_store.create(student_id, "lesson", found_lesson.id, answer_key)
+
+        result_lesson_test_list = []
+        for lesson_test in lesson_test_random_list:
+            dict_lesson_test = LessonTest.to_dict(lesson_test)
+            dict_lesson_test.pop("correct_option")
+            result_lesson_test_list.append(dict_lesson_test)
+
+        result_session = {
+            "session_id": session_id,
+            "expires_in": exam_session_store.ttl,
+            "lesson_test_list": result_lesson_test_list
+        }
+        return get_response("Exam session successfully created", result_session, 200), 200
+
+class LessonTestSessionFinishResource(Resource):
+    decorators = [role_required(["STUDENT"])]
+
+    def post(self, session_id):
+        """Lesson Test Session Finish API
+        Path - /api/lesson_test/session/finish/<session_id>
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: session_id
+              in: path
+              type: string
+              required: true
+              description: Enter Exam Session ID
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    answer_list: 
+                        type: list
+                required: [answer_list]
+        responses:
+            200:
+                description: Grade answers, save progress and return Lesson Test Result
+            400:
+                description: (Answer List is Blank) or (Answer List must be a list)
+            404:
+                description: (Exam session not found) or (Lesson not found)
+        """
+        data = lesson_test_result_parse.parse_args()
+        answer_list = data['answer_list']
+
+        if not answer_list or not isinstance(answer_list, list):
+            return get_response("Answer List must be a list", None, 400), 400
+
+        student_id = g.current_identity["user_id"]
+        session = exam_session_store.get(session_id, student_id, "lesson")
+        if not session:
+            return get_response("Exam session not found", None, 404), 404
+
+        answer_key = session.answer_key()
+        correct_count, graded_answer_list = grade_answers(answer_list, 'lesson_test_id', answer_key)
+
+        found_lesson = Lesson.query.filter_by(id=session.parent_id).first()
+        if not found_lesson:
+            return get_response("Lesson not found", None, 404), 404
+
+        # Sessiya faqat natija saqlanadigan tranzaksiyada o'chiriladi (ikki marta topshirib bo'lmaydi)
+        if not exam_session_store.consume(session.id):
+            return get_response("Exam session not found", None, 404), 404
+
+        finish_lesson_test(student_id, found_lesson, correct_count)
+        # Progress allaqachon yakunlangan bo'lsa finish_lesson_test commit qilmaydi - sessiya o'chirilishi saqlansin
         db.session.commit()
 
-        return get_response("Successfully Finish Lesson Test", None, 200), 200
+        passed = correct_count >= 7
+        result_test = {
+            "total": len(answer_key),
+            "correct_count": correct_count,
+            "passed": passed,
+            "answer_list": graded_answer_list
+        }
+        return get_response("Lesson Test Result", result_test, 200), 200
 
 api.add_resource(LessonTestResource, "/<lesson_test_id>")
 api.add_resource(LessonTestListCreateResource, "/lesson/<lesson_id>")
 api.add_resource(LessonTestActionResource, "/action/<lesson_id>")
 api.add_resource(LessonTestFinishActionResource, "/finish/action/<student_id>/<lesson_id>/<correct_count>")
+api.add_resource(LessonTestSessionResource, "/session/<lesson_id>")
+api.add_resource(LessonTestSessionFinishResource, "/session/finish/<session_id>")
@@ -4,7 +4,7 @@ from pathlib import Path
 from flask import Blueprint
 from models.user import User
 from models.course import Course
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from flask_restful import Api, Resource
 from utils.decorators import role_required
 from flask_jwt_extended import get_jwt_identity
@@ -24,6 +24,7 @@ service = build('calendar', 'v3', credentials=credentials)
 
 meeting_lesson_bp = Blueprint("meeting_lesson", __name__, url_prefix="/api/meeting_lesson")
 api = Api(meeting_lesson_bp)
+api.representations["application/json"] = output_json
 
 class MeetingLessonResource(Resource):
     decorators = [role_required(["TEACHER", "STUDENT"])]
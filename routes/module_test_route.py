@@ -1,16 +1,18 @@
-import random
 from models import db
-from flask import Blueprint
+from sqlalchemy import func
+from flask import Blueprint, g
 from models.user import User
 from models.course import Course
 from models.lesson import Lesson
 from datetime import date, timedelta
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from models.module_test import ModuleTest
 from utils.decorators import role_required
+from utils.exam_session import exam_session_store
+from utils.conditional_get import bump_catalog_version
+from utils.grading import answer_key_cache, grade_answers, sample_questions
 from models.course_module import CourseModule
 from models.module_student import ModuleStudent
-from flask_jwt_extended import get_jwt_identity
 from flask_restful import Api, Resource, reqparse
 from models.lesson_test_progress import LessonTestProgress
 from models.module_test_progress import ModuleTestProgress
@@ -36,8 +38,41 @@ module_test_update_parse.add_argument("correct_option", type=str)
 module_test_result_parse = reqparse.RequestParser()
 module_test_result_parse.add_argument("answer_list", type=list, location="json", required=True, help="Answer List cannot be blank")
 
+module_test_sample_parse = reqparse.RequestParser()
+module_test_sample_parse.add_argument("seed", type=str, location="args")
+
 module_test_bp = Blueprint("module_test", __name__, url_prefix="/api/module_test")
 api = Api(module_test_bp)
+api.representations["application/json"] = output_json
+
+def finish_module_test(student_id, found_module, correct_count):
+    """Module test natijasini progressga yozadi va keyingi modulni ochadi"""
+    progress = ModuleTestProgress.query.filter_by(student_id=student_id, module_id=found_module.id).first()
+    if not progress:
+        progress = ModuleTestProgress(student_id, found_module.id, False, 0)
+    
+    progress.best_score = max(progress.best_score, correct_count)
+    if correct_count >= 28:
+        progress.is_completed = True
+        next_module = CourseModule.query.filter(CourseModule.order == found_module.order + 1).first()
+
+        if next_module:
+            found_progress = ModuleTestProgress.query.filter_by(student_id=student_id, module_id=next_module.id, is_completed=False).first()
+            if not found_progress:
+                new_progress = ModuleTestProgress(student_id, next_module.id, False, 0)
+                db.session.add(new_progress)
+                
+                today_date = date.today()
+                new_module_student = ModuleStudent(student_id, today_date)
+                db.session.add(new_module_student)
+
+                tomorrow_date = today_date + timedelta(days=1)
+                new_module_student = ModuleStudent(student_id, tomorrow_date)
+                db.session.add(new_module_student)
+    
+    db.session.add(progress)
+    db.session.commit()
+    return None
 
 class ModuleTestResource(Resource):
     decorators = [role_required(["ADMIN"])]
@@ -101,7 +136,9 @@ class ModuleTestResource(Resource):
             return get_response("Module Test not found", None, 404), 404
 
         db.session.delete(module_test)
+        bump_catalog_version("module_test")
         db.session.commit()
+        answer_key_cache.invalidate(ModuleTest, module_test.module_id)
         return get_response("Successfully deleted module test", None, 200), 200
 
     def patch(self, module_test_id):
@@ -153,6 +190,7 @@ class ModuleTestResource(Resource):
         if not found_module_test:
             return get_response("Module Test not found", None, 404), 404
 
+        old_module_id = found_module_test.module_id
         data = module_test_update_parse.parse_args()
         module_id = data.get('module_id', None)
         question_text = data.get('question_text', None)
@@ -178,7 +216,10 @@ class ModuleTestResource(Resource):
             correct_option = correct_option.upper()
             found_module_test.correct_option = correct_option
 
+        bump_catalog_version("module_test")
         db.session.commit()
+        answer_key_cache.invalidate(ModuleTest, old_module_id)
+        answer_key_cache.invalidate(ModuleTest, found_module_test.module_id)
         return get_response("Successfully updated module test", None, 200), 200
 
 class ModuleTestListCreateResource(Resource):
@@ -282,7 +323,9 @@ class ModuleTestListCreateResource(Resource):
         
         new_module_test = ModuleTest(in_module_id, question_text, option_a, option_b, option_c, option_d, correct_option)
         db.session.add(new_module_test)
+        bump_catalog_version("module_test")
         db.session.commit()
+        answer_key_cache.invalidate(ModuleTest, in_module_id)
         return get_response("Successfully created module test", new_module_test.id, 200), 200
 
 class ModuleTestActionResource(Resource):
@@ -306,6 +349,12 @@ class ModuleTestActionResource(Resource):
               type: integer
               required: true
               description: Enter Module ID
+
+            - name: seed
+              in: query
+              type: string
+              required: false
+              description: Random seed for a reproducible question set
         responses:
             200:
                 description: Return a Module Test
@@ -316,8 +365,10 @@ class ModuleTestActionResource(Resource):
         if not found_module:
             return get_response("Module not found", None, 404), 404
         
-        module_test_list = ModuleTest.query.filter_by(module_id=found_module.id).all()
-        module_test_random_list = random.sample(module_test_list, 40)
+        data = module_test_sample_parse.parse_args()
+        seed = data.get('seed', None)
+
+        module_test_random_list = sample_questions(ModuleTest, ModuleTest.module_id, found_module.id, 40, seed)
 
         result_module_test_random_list = [ModuleTest.to_dict(module_test) for module_test in module_test_random_list]
         return get_response("Module Test successfully found", result_module_test_random_list, 200), 200
@@ -361,34 +412,24 @@ class ModuleTestActionResource(Resource):
         data = module_test_result_parse.parse_args()
         answer_list = data['answer_list']
 
-        found_module = CourseModule.query.filter_by(id=module_id).first()
-        if not found_module:
-            return get_response("Module not found", None, 404), 404
-    
         if not answer_list or not isinstance(answer_list, list):
             return get_response("Answer List must be a list", None, 400), 400
-    
-        correct_count = 0
-        for answer in answer_list:
-            if not isinstance(answer, dict):
-                continue
-            
-            module_test_id = answer.get('module_test_id')
-            result = answer.get('result')
 
-            if not module_test_id or not result:
-                continue
-            result = result.upper()
+        # Cache to'la bo'lsa DB ga umuman murojaat qilinmaydi
+        answer_key = answer_key_cache.get(ModuleTest, ModuleTest.module_id, module_id)
+        if not answer_key:
+            found_module = CourseModule.query.filter_by(id=module_id).first()
+            if not found_module:
+                return get_response("Module not found", None, 404), 404
+    
+        correct_count, graded_answer_list = grade_answers(answer_list, 'module_test_id', answer_key)
 
-            module_test = ModuleTest.query.filter_by(id=module_test_id, module_id=found_module.id).first()
-            if module_test and module_test.correct_option == result:
-                correct_count += 1
-            
         passed = correct_count >= 28
         result_test = {
             "total": len(answer_list),
             "correct_count": correct_count,
-            "passed": passed
+            "passed": passed,
+            "answer_list": graded_answer_list
         }
         
         return get_response("Module Test Result", result_test, 200), 200
@@ -440,33 +481,7 @@ class ModuleTestFinishActionResource(Resource):
         if not found_module:
             return get_response("Module not found", None, 404), 404
         
-        progress = ModuleTestProgress.query.filter_by(student_id=found_student.id, module_id=found_module.id).first()
-        if not progress:
-            progress = ModuleTestProgress(found_student.id, found_module.id, False, 0)
-        
-        correct_count = int(correct_count)
-        progress.best_score = max(progress.best_score, correct_count)
-        if correct_count >= 28:
-            progress.is_completed = True
-            next_module = CourseModule.query.filter(CourseModule.order == found_module.order + 1).first()
-
-            if next_module:
-                found_progress = ModuleTestProgress.query.filter_by(student_id=found_student.id, module_id=next_module.id, is_completed=False).first()
-                if not found_progress:
-                    new_progress = ModuleTestProgress(found_student.id, next_module.id, False, 0)
-                    db.session.add(new_progress)
-                    
-                    today_date = date.today()
-                    new_module_student = ModuleStudent(found_student.id, today_date)
-                    db.session.add(new_module_student)
-
-                    tomorrow_date = today_date + timedelta(days=1)
-                    new_module_student = ModuleStudent(found_student.id, tomorrow_date)
-                    db.session.add(new_module_student)
-        
-        db.session.add(progress)
-        db.session.commit()
-
+        finish_module_test(found_student.id, found_module, int(correct_count))
         return get_response("Successfully Finish Module Test", None, 200), 200
 
 class ModuleTestListActionResource(Resource):
@@ -491,60 +506,211 @@ class ModuleTestListActionResource(Resource):
             404:
                 description: (Student not found) or (Module not found)
         """
-        username = get_jwt_identity()
+        identity = g.current_identity
+        student_id = identity["user_id"]
 
-        found_student = User.query.filter_by(username=username, role="STUDENT").first()
-        if not found_student:
-            return get_response("Student not found", None, 404), 404
-        
         module_list = []
         today_date = date.today()
-        module_student = ModuleStudent.query.filter_by(student_id=found_student.id, date=today_date).first()
-
-        if module_student is None:
-            course_list = Course.query.filter_by(type_id=found_student.type_id).all()
-            for course in course_list:
-                course_module_list = CourseModule.query.filter_by(course_id=course.id).all()
-                for course_module in course_module_list:
-                    module_test_list = ModuleTest.query.filter_by(module_id=course_module.id).all()
-                    if len(module_test_list) <= 0:
-                        continue
-                    else:
-                        lesson_list = Lesson.query.filter_by(course_module_id=course_module.id).order_by(Lesson.order.asc()).all()
-                        lesson = lesson_list[-1]
-                        lesson_test_progress = LessonTestProgress.query.filter_by(student_id=found_student.id, lesson_id=lesson.id, is_completed=True).first()
-                        if lesson_test_progress is None:
-                            result_dict = {
-                                "is_open": False,
-                                "is_passed": False
-                            }
-
-                            result_course_module = CourseModule.to_dict(course_module)
-                            result_dict.update({"module": result_course_module})
-
-                            module_list.append(result_dict)
-                        else:
-                            result_dict = {
-                                "is_open": True
-                            }
-
-                            module_test_progress = ModuleTestProgress.query.filter_by(student_id=found_student.id, module_id=course_module.id, is_completed=True).first()
-                            if module_test_progress is None:
-                                result_dict.update({"is_passed": False})
-                            else:
-                                result_dict.update({"is_passed": True})
-
-                            result_course_module = CourseModule.to_dict(course_module)
-                            result_dict.update({"module": result_course_module})
-
-                            module_list.append(result_dict)
-
+        module_student = ModuleStudent.query.filter_by(student_id=student_id, date=today_date).first()
+        if module_student is not None:
             return get_response("Module List", module_list, 200)
-        else:
+
+        # Testi bor barcha modullar (bitta query)
+        course_module_list = (
+            CourseModule.query
+            .join(Course, Course.id == CourseModule.course_id)
+            .filter(
+                Course.type_id == identity["type_id"],
+                db.session.query(ModuleTest.id).filter(ModuleTest.module_id == CourseModule.id).exists()
+            )
+            .order_by(Course.id.asc(), CourseModule.id.asc())
+            .all()
+        )
+        if not course_module_list:
             return get_response("Module List", module_list, 200)
 
+        course_module_id_list = [course_module.id for course_module in course_module_list]
+
+        # Har bir modulning oxirgi darsi (window function) va u tugatilganmi
+        last_lesson_subquery = (
+            db.session.query(
+                Lesson.id.label("lesson_id"),
+                Lesson.course_module_id.label("course_module_id"),
+                func.row_number().over(
+                    partition_by=Lesson.course_module_id,
+                    order_by=(Lesson.order.desc(), Lesson.id.desc())
+                ).label("row_number")
+            )
+            .filter(Lesson.course_module_id.in_(course_module_id_list))
+            .subquery()
+        )
+        open_module_id_set = {
+            course_module_id
+            for course_module_id, in db.session.query(last_lesson_subquery.c.course_module_id)
+            .join(
+                LessonTestProgress,
+                LessonTestProgress.lesson_id == last_lesson_subquery.c.lesson_id
+            )
+            .filter(
+                last_lesson_subquery.c.row_number == 1,
+                LessonTestProgress.student_id == student_id,
+                LessonTestProgress.is_completed == True
+            )
+            .all()
+        }
+
+        passed_module_id_set = {
+            module_id
+            for module_id, in db.session.query(ModuleTestProgress.module_id)
+            .filter(
+                ModuleTestProgress.student_id == student_id,
+                ModuleTestProgress.module_id.in_(course_module_id_list),
+                ModuleTestProgress.is_completed == True
+            )
+            .all()
+        }
+
+        for course_module in course_module_list:
+            is_open = course_module.id in open_module_id_set
+            result_dict = {
+                "is_open": is_open,
+                "is_passed": is_open and course_module.id in passed_module_id_set,
+                "module": CourseModule.to_dict(course_module)
+            }
+            module_list.append(result_dict)
+
+        return get_response("Module List", module_list, 200)
+
+class ModuleTestSessionResource(Resource):
+    decorators = [role_required(["STUDENT"])]
+
+    def post(self, module_id):
+        """Module Test Session Create API
+        Path - /api/module_test/session/<module_id>
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: module_id
+              in: path
+              type: integer
+              required: true
+              description: Enter Module ID
+        responses:
+            200:
+                description: Return Exam Session ID and Module Test List (without correct options)
+            404:
+                description: (Module not found) or (Module Test not found)
+        """
+        found_module = CourseModule.query.filter_by(id=module_id).first()
+        if not found_module:
+            return get_response("Module not found", None, 404), 404
+
+        module_test_random_list = sample_questions(ModuleTest, ModuleTest.module_id, found_module.id, 40)
+        if not module_test_random_list:
+            return get_response("Module Test not found", None, 404), 404
+
+        answer_key = {module_test.id: module_test.correct_option for module_test in module_test_random_list}
+
+        student_id = g.current_identity["user_id"]
+        session_id = exam_session_store.create(student_id, "module", found_module.id, answer_key)
+
+        result_module_test_list = []
+        for module_test in module_test_random_list:
+            dict_module_test = ModuleTest.to_dict(module_test)
+            dict_module_test.pop("correct_option")
+            result_module_test_list.append(dict_module_test)
+
+        result_session = {
+            "session_id": session_id,
+            "expires_in": exam_session_store.ttl,
+            "module_test_list": result_module_test_list
+        }
+        return get_response("Exam session successfully created", result_session, 200), 200
+
+class ModuleTestSessionFinishResource(Resource):
+    decorators = [role_required(["STUDENT"])]
+
+    def post(self, session_id):
+        """Module Test Session Finish API
+        Path - /api/module_test/session/finish/<session_id>
+        Method - POST
+        ---
+        consumes: application/json
+        parameters:
+            - in: header
+              name: Authorization
+              type: string
+              required: true
+              description: Bearer token for authentication
+
+            - name: session_id
+              in: path
+              type: string
+              required: true
+              description: Enter Exam Session ID
+
+            - name: body
+              in: body
+              required: true
+              schema:
+                type: object
+                properties:
+                    answer_list: 
+                        type: list
+                required: [answer_list]
+        responses:
+            200:
+                description: Grade answers, save progress and return Module Test Result
+            400:
+                description: (Answer List is Blank) or (Answer List must be a list)
+            404:
+                description: (Exam session not found) or (Module not found)
+        """
+        data = module_test_result_parse.parse_args()
+        answer_list = data['answer_list']
+
+        if not answer_list or not isinstance(answer_list, list):
+            return get_response("Answer List must be a list", None, 400), 400
+
+        student_id = g.current_identity["user_id"]
+        session = exam_session_store.get(session_id, student_id, "module")
+        if not session:
+            return get_response("Exam session not found", None, 404), 404
+
+        answer_key = session.answer_key()
+        correct_count, graded_answer_list = grade_answers(answer_list, 'module_test_id', answer_key)
+
+        found_module = CourseModule.query.filter_by(id=session.parent_id).first()
+        if not found_module:
+            return get_response("Module not found", None, 404), 404
+
+        # Sessiya faqat natija saqlanadigan tranzaksiyada o'chiriladi (ikki marta topshirib bo'lmaydi)
+        if not exam_session_store.consume(session.id):
+            return get_response("Exam session not found", None, 404), 404
+
+        # finish_module_test commit qiladi - sessiya o'chirilishi natija bilan birga saqlanadi
+        finish_module_test(student_id, found_module, correct_count)
+
+        passed = correct_count >= 28
+        result_test = {
+            "total": len(answer_key),
+            "correct_count": correct_count,
+            "passed": passed,
+            "answer_list": graded_answer_list
+        }
+        return get_response("Module Test Result", result_test, 200), 200
+
 api.add_resource(ModuleTestResource, "/<module_test_id>")
 api.add_resource(ModuleTestListCreateResource, "/module/<module_id>")
 api.add_resource(ModuleTestActionResource, "/action/<module_id>")
 api.add_resource(ModuleTestFinishActionResource, "/finish/action/<student_id>/<module_id>/<correct_count>")
 api.add_resource(ModuleTestListActionResource, "/list/action")
+api.add_resource(ModuleTestSessionResource, "/session/<module_id>")
+api.add_resource(ModuleTestSessionFinishResource, "/session/finish/<session_id>")
@@ -1,8 +1,12 @@
 from models import db
 from flask import Blueprint
+from sqlalchemy.orm import undefer
 from models.news import News
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.pagination import paginate_request, InvalidCursor
+from utils.projection import fields_request, load_fields, InvalidFields
 from flask_restful import Api, Resource, reqparse
 
 news_create_parse = reqparse.RequestParser()
@@ -21,10 +25,12 @@ news_update_parse.add_argument("image_url", type=str)
 
 news_bp = Blueprint("news", __name__, url_prefix="/api/news")
 api = Api(news_bp)
+api.representations["application/json"] = output_json
 
 class NewsRecource(Resource):
 
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("news")
     def get(self):
         """News List API
         Path - /api/news
@@ -37,13 +43,43 @@ class NewsRecource(Resource):
               type: string
               required: true
               description: Bearer token for authentication
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size (default 50, max 200)
+
+            - name: after
+              in: query
+              type: string
+              required: false
+              description: Cursor from previous page (next_cursor)
+
+            - name: fields
+              in: query
+              type: string
+              required: false
+              description: Faqat kerakli maydonlar, vergul bilan (masalan id,title,order)
+
         responses:
             200:
                 description: Return a News List
+            400:
+                description: (Invalid cursor) or (Invalid fields)
         """
-        news_list = News.query.all()
-        result_news_list = [News.to_dict(news) for news in news_list]
-        return get_response("News List", result_news_list, 200), 200
+        try:
+            field_list = fields_request(News)
+        except InvalidFields:
+            return get_response("Invalid fields", None, 400), 400
+
+        try:
+            news_list, next_cursor = paginate_request(load_fields(News.query, News, field_list, ["id", "created_at"]), News)
+        except InvalidCursor:
+            return get_response("Invalid cursor", None, 400), 400
+
+        result_news_list = [News.to_dict(news, field_list) for news in news_list]
+        return get_response("News List", result_news_list, 200, next_cursor), 200
     
     @role_required(["ADMIN"])
     def post(self):
@@ -91,6 +127,7 @@ class NewsRecource(Resource):
 
         new_news = News(title, description, content, file_url, image_url)
         db.session.add(new_news)
+        bump_catalog_version("news")
         db.session.commit()
         return get_response("Successfully created news", new_news.id, 200), 200
 
@@ -160,6 +197,7 @@ class NewsDetailRecource(Resource):
         if image_url is not None:
             found_news.image_url = image_url
 
+        bump_catalog_version("news")
         db.session.commit()
         return get_response("Successfully updated news", None, 200), 200
     
@@ -193,10 +231,12 @@ class NewsDetailRecource(Resource):
             return get_response("News not found", None, 404), 404
         
         db.session.delete(found_news)
+        bump_catalog_version("news")
         db.session.commit()
         return get_response("Successfully deleted news", None, 200), 200
     
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("news")
     def get(self, news_id):
         """News Get API
         Path - /api/news/<news_id>
@@ -221,7 +261,7 @@ class NewsDetailRecource(Resource):
             404:
                 description: News not found
         """
-        found_news = News.query.filter_by(id=news_id).first()
+        found_news = News.query.options(undefer("*")).filter_by(id=news_id).first()
         if not found_news:
             return get_response("News not found", None, 404), 404
         
@@ -3,8 +3,9 @@ from models import db
 from flask import Blueprint
 from models.user import User
 from datetime import datetime
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.pagination import paginate_request, InvalidCursor
 from models.notification import Notification
 from flask_restful import Api, Resource, reqparse
 from models.notification_user import NotificationUser
@@ -27,6 +28,7 @@ notification_read_parse.add_argument("notification_id", type=int, required=True,
 
 notification_bp = Blueprint("notification", __name__, url_prefix="/api/notification")
 api = Api(notification_bp)
+api.representations["application/json"] = output_json
 
 class NotificationResource(Resource):
 
@@ -172,13 +174,29 @@ class NotificationListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size (default 50, max 200)
+
+            - name: after
+              in: query
+              type: string
+              required: false
+              description: Cursor from previous page (next_cursor)
+
         responses:
             200:
                 description: Return Notification List
         """
-        notification_list = Notification.query.filter_by().order_by(Notification.created_at.desc()).all()
+        try:
+            notification_list, next_cursor = paginate_request(Notification.query.filter_by(), Notification)
+        except InvalidCursor:
+            return get_response("Invalid cursor", None, 400), 400
+
         result_notification_list = [Notification.to_dict(notification) for notification in notification_list]
-        return get_response("Notification List", result_notification_list, 200), 200
+        return get_response("Notification List", result_notification_list, 200, next_cursor), 200
 
     def post(self):
         """Notification Create API
@@ -1,7 +1,7 @@
 from models import db
 from flask import Blueprint
 from models.user import User
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
 from models.notification import Notification
 from flask_restful import Api, Resource, reqparse
@@ -13,6 +13,7 @@ notification_user_parse.add_argument("notification_id", type=int, required=True,
 
 notification_user_bp = Blueprint("notification_user", __name__, url_prefix="/api/notification_user")
 api = Api(notification_user_bp)
+api.representations["application/json"] = output_json
 
 class NotificationUserResource(Resource):
     decorators = [role_required(["ADMIN"])]
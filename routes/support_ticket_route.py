@@ -1,8 +1,9 @@
 from models import db
 from flask import Blueprint
 from models.user import User
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.support_inbox import get_ticket_list_for_support, get_ticket_list_for_student, get_message_page, message_list_to_dict, record_new_message, recount_ticket_counters
 from flask_jwt_extended import get_jwt_identity
 from models.support_ticket import SupportTicket
 from models.support_message import SupportMessage
@@ -16,8 +17,13 @@ support_ticket_create_parse.add_argument("file_path", type=str)
 support_ticket_message_update_parse = reqparse.RequestParser()
 support_ticket_message_update_parse.add_argument("message", type=str)
 
+support_ticket_message_page_parse = reqparse.RequestParser()
+support_ticket_message_page_parse.add_argument("before_id", type=int, location="args")
+support_ticket_message_page_parse.add_argument("limit", type=int, location="args")
+
 support_ticket_bp = Blueprint("support_ticket", __name__, url_prefix="/api/support/ticket")
 api = Api(support_ticket_bp)
+api.representations["application/json"] = output_json
 
 class SupportTicketResource(Resource):
 
@@ -40,20 +46,34 @@ class SupportTicketResource(Resource):
               type: integer
               required: true
               description: Enter Ticket ID
+
+            - name: before_id
+              in: query
+              type: integer
+              required: false
+              description: Shu xabardan oldingi xabarlar (oldingi javobdagi next_cursor)
+
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Sahifadagi xabarlar soni (default 50, max 200)
         responses:
             200:
-                description: Return a Messages
+                description: Return a Messages (eng yangi sahifa birinchi, next_cursor - keyingi before_id)
             404:
                 description: Support Ticket not found
         """
+        data = support_ticket_message_page_parse.parse_args()
+
         found_support_ticket = SupportTicket.query.filter_by(id=ticket_id).first()
         if not found_support_ticket:
             return get_response("Support Ticket not found", None, 404), 404
         
-        support_message_list = SupportMessage.query.filter_by(ticket_id=found_support_ticket.id).order_by(SupportMessage.created_at.asc()).all()
-        result_support_message_list = [SupportMessage.to_dict(support_message) for support_message in support_message_list]
+        support_message_list, next_before_id = get_message_page(found_support_ticket.id, data.get("before_id", None), data.get("limit", None))
+        result_support_message_list = message_list_to_dict(found_support_ticket, support_message_list)
 
-        return get_response("Messages successfully found", result_support_message_list, 200), 200
+        return get_response("Messages successfully found", result_support_message_list, 200, next_before_id), 200
     
     @role_required(["STUDENT"])
     def post(self, ticket_id):
@@ -111,6 +131,7 @@ class SupportTicketResource(Resource):
 
         new_support_message = SupportMessage(found_ticket.id, found_student.id, found_student.role, message, file_path)
         db.session.add(new_support_message)
+        record_new_message(found_ticket, new_support_message)
         db.session.commit()
 
         return get_response("Successfully created new support message", new_support_message.id, 200), 200
@@ -142,29 +163,7 @@ class SupportTicketListCreateResource(Resource):
         if not found_student:
             return get_response("Student not found", None, 404), 404
         
-        result_dict = {}
-        result_unread_count = 0
-        result_support_ticket_list = []
-
-        support_ticket_list = SupportTicket.query.filter_by(student_id=found_student.id).order_by(SupportTicket.created_at.desc()).all()
-        for support_ticket in support_ticket_list:
-            unread_count = SupportMessage.query.filter(
-                SupportMessage.ticket_id == support_ticket.id,
-                SupportMessage.sender_role == "SUPPORT",
-                SupportMessage.is_read == False
-            ).count()
-            result_unread_count += unread_count
-
-            dict_support_ticket = SupportTicket.to_dict(support_ticket)
-
-            found_message = SupportMessage.query.filter_by(ticket_id=support_ticket.id).order_by(SupportMessage.created_at.desc()).first()
-            if found_message:
-                dict_support_ticket.update({"last_message": SupportMessage.to_dict(found_message)})
-                
-            result_support_ticket_list.append(dict_support_ticket)
-        
-        result_dict.update({"unread_count": result_unread_count})
-        result_dict.update({"tickets": result_support_ticket_list})
+        result_dict = get_ticket_list_for_student(found_student.id)
 
         return get_response("Support Ticket List", result_dict, 200), 200
 
@@ -221,6 +220,7 @@ class SupportTicketListCreateResource(Resource):
 
         new_support_message = SupportMessage(new_support_ticket.id, found_student.id, found_student.role, message, file_path)
         db.session.add(new_support_message)
+        record_new_message(new_support_ticket, new_support_message)
         db.session.commit()
 
         return get_response("Successfully created new support ticket", new_support_ticket.id, 200), 200
@@ -244,43 +244,7 @@ class SupportTicketShowActionResource(Resource):
             200:
                 description: Return a Ticket List
         """
-        result_dict = {}
-        result_unread_count = 0
-        result_support_ticket_list = []
-        support_ticket_list = SupportTicket.query.order_by(SupportTicket.created_at.desc()).all()
-
-        for support_ticket in support_ticket_list:
-            found_student = User.query.filter_by(id=support_ticket.student_id, role="STUDENT").first()
-
-            unread_count = SupportMessage.query.filter(
-                SupportMessage.ticket_id == support_ticket.id,
-                SupportMessage.sender_role == "STUDENT",
-                SupportMessage.is_read == False
-            ).count()
-            result_unread_count += unread_count
-
-            if found_student:
-                dict_support_ticket = SupportTicket.to_dict(support_ticket)
-                dict_found_student = User.to_dict(found_student)
-
-                found_message = SupportMessage.query.filter_by(ticket_id=support_ticket.id).order_by(SupportMessage.created_at.desc()).first()
-                if found_message:
-                    dict_support_ticket.update({"last_message": SupportMessage.to_dict(found_message)})
-
-                dict_support_ticket.update({"student": dict_found_student})
-                result_support_ticket_list.append(dict_support_ticket)
-            else:
-                dict_support_ticket = SupportTicket.to_dict(support_ticket)
-
-                found_message = SupportMessage.query.filter_by(ticket_id=support_ticket.id).order_by(SupportMessage.created_at.desc()).first()
-                if found_message:
-                    dict_support_ticket.update({"last_message": SupportMessage.to_dict(found_message)})
-
-                dict_support_ticket.update({"student": None})
-                result_support_ticket_list.append(dict_support_ticket)
-        
-        result_dict.update({"unread_count": result_unread_count})
-        result_dict.update({"tickets": result_support_ticket_list})
+        result_dict = get_ticket_list_for_support()
         return get_response("Support Ticket List", result_dict, 200), 200
 
 class SupportTicketReplyActionResource(Resource):
@@ -343,6 +307,7 @@ class SupportTicketReplyActionResource(Resource):
 
         new_support_message = SupportMessage(found_ticket.id, found_user.id, found_user.role, message, file_path)
         db.session.add(new_support_message)
+        record_new_message(found_ticket, new_support_message)
         db.session.commit()
 
         return get_response("Successfully created new support message", new_support_message.id, 200), 200
@@ -460,7 +425,11 @@ class SupportTicketMessageActionResource(Resource):
         if not found_message:
             return get_response("Message not found", None, 404), 404
 
+        ticket_id = found_message.ticket_id
         db.session.delete(found_message)
+        db.session.flush()
+
+        recount_ticket_counters([ticket_id])
         db.session.commit()
         return get_response("Successfully support ticket message deleted", None, 200), 200
 
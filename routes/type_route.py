@@ -1,8 +1,10 @@
 from models import db
 from flask import Blueprint
 from models.type import Type
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.conditional_get import conditional_get, bump_catalog_version
+from utils.pagination import paginate_request, InvalidCursor
 from flask_restful import Api, Resource, reqparse
 
 type_create_parse = reqparse.RequestParser()
@@ -15,10 +17,12 @@ type_update_parse.add_argument("description", type=str)
 
 type_bp = Blueprint("type", __name__, url_prefix="/api/type")
 api = Api(type_bp)
+api.representations["application/json"] = output_json
 
 class TypeResource(Resource):
     decorators = [role_required(["ADMIN"])]
 
+    @conditional_get("type")
     def get(self, type_id):
         """Type Get API
         Path - /api/type/<type_id>
@@ -78,6 +82,7 @@ class TypeResource(Resource):
             return get_response("Type not found", None, 404), 404
 
         db.session.delete(type)
+        bump_catalog_version("type")
         db.session.commit()
         return get_response("Successfully deleted type", None, 200), 200
 
@@ -129,12 +134,14 @@ class TypeResource(Resource):
         if description is not None:
             found_type.description = description
 
+        bump_catalog_version("type")
         db.session.commit()
         return get_response("Successfully updated type", None, 200), 200
 
 class TypeListCreateResource(Resource):
     
     @role_required(["ADMIN", "STUDENT"])
+    @conditional_get("type")
     def get(self):
         """Type List API
         Path - /api/type
@@ -148,13 +155,29 @@ class TypeListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size (default 50, max 200)
+
+            - name: after
+              in: query
+              type: string
+              required: false
+              description: Cursor from previous page (next_cursor)
+
         responses:
             200:
                 description: Return Type List
         """
-        type_list = Type.query.filter_by().order_by(Type.created_at.desc()).all()
+        try:
+            type_list, next_cursor = paginate_request(Type.query.filter_by(), Type)
+        except InvalidCursor:
+            return get_response("Invalid cursor", None, 400), 400
+
         result_type_list = [Type.to_dict(type) for type in type_list]
-        return get_response("Type List", result_type_list, 200), 200
+        return get_response("Type List", result_type_list, 200, next_cursor), 200
 
     @role_required(["ADMIN"])
     def post(self):
@@ -197,6 +220,7 @@ class TypeListCreateResource(Resource):
         
         new_type = Type(title, description)
         db.session.add(new_type)
+        bump_catalog_version("type")
         db.session.commit()
         return get_response("Successfully created type", new_type.id, 200), 200
 
@@ -1,7 +1,10 @@
 from models import db
 from flask import Blueprint
-from utils.utils import get_response
+from utils.utils import get_response, output_json
 from utils.decorators import role_required
+from utils.pagination import paginate_request, InvalidCursor
+from utils.identity import invalidate_identity
+from utils.support_inbox import recount_ticket_counters
 from flask_bcrypt import generate_password_hash
 from flask_restful import Api, Resource, reqparse
 
@@ -38,6 +41,7 @@ user_update_parse.add_argument("is_active", type=bool)
 
 user_bp = Blueprint("user", __name__, url_prefix="/api/user")
 api = Api(user_bp)
+api.representations["application/json"] = output_json
 
 class UserResource(Resource):    
 
@@ -124,13 +128,22 @@ class UserResource(Resource):
         support_ticket_list = SupportTicket.query.filter_by(student_id=user.id).all()
         for support_ticket in support_ticket_list:
             db.session.delete(support_ticket)
+
+        # Boshqa ticketlardagi xabarlari o'chgan bo'lsa, counterlarni qayta hisoblash
+        deleted_ticket_id_set = {support_ticket.id for support_ticket in support_ticket_list}
+        affected_ticket_id_set = {support_message.ticket_id for support_message in support_message_list} - deleted_ticket_id_set
+        if affected_ticket_id_set:
+            db.session.flush()
+            recount_ticket_counters(list(affected_ticket_id_set))
         
         notification_user_list = NotificationUser.query.filter_by(user_id=user.id).all()
         for notification_user in notification_user_list:
             db.session.delete(notification_user)
         
+        username = user.username
         db.session.delete(user)
         db.session.commit()
+        invalidate_identity(username)
         return get_response("Successfully deleted user", None, 200), 200
     
     @role_required(["ADMIN", "TEACHER", "STUDENT", "SUPPORT"])
@@ -185,6 +198,7 @@ class UserResource(Resource):
         if not found_user:
             return get_response("User not found", None, 404), 404
         
+        old_username = found_user.username
         data = user_update_parse.parse_args()
         full_name = data.get('full_name', None)
         phone_number = data.get('phone_number', None)
@@ -212,7 +226,15 @@ class UserResource(Resource):
         if is_active is not None:
             found_user.is_active = is_active
 
+        # Token claimlari eskirdi: versiya oshiriladi, barcha workerlar keyingi so'rovlarda DB qiymatini oladi
+        is_identity_changed = username is not None or role is not None or type_id is not None or is_active is not None
+        if is_identity_changed:
+            found_user.token_version = (found_user.token_version or 0) + 1
+
         db.session.commit()
+
+        if is_identity_changed:
+            invalidate_identity(old_username)
         return get_response("Successfully updated user", None, 200), 200
 
 class UserListCreateResource(Resource):
@@ -231,13 +253,29 @@ class UserListCreateResource(Resource):
               required: true
               description: Bearer token for authentication
 
+            - name: limit
+              in: query
+              type: integer
+              required: false
+              description: Page size (default 50, max 200)
+
+            - name: after
+              in: query
+              type: string
+              required: false
+              description: Cursor from previous page (next_cursor)
+
         responses:
             200:
                 description: Return Student List
         """
-        user_list = User.query.order_by(User.created_at.desc()).all()
+        try:
+            user_list, next_cursor = paginate_request(User.query, User)
+        except InvalidCursor:
+            return get_response("Invalid cursor", None, 400), 400
+
         result_user_list = [User.to_dict(user) for user in user_list]
-        return get_response("Student List", result_user_list, 200), 200
+        return get_response("Student List", result_user_list, 200, next_cursor), 200
 
     def post(self):
         """User Create API
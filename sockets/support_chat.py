@@ -1,19 +1,104 @@
-from sqlalchemy import func
+import time
 from flask_socketio import emit, join_room, leave_room
 from flask_jwt_extended import decode_token
-from flask import current_app
+from flask import current_app, request, session
 
 from models import db
-from models.user import User
 from models.support_ticket import SupportTicket
 from models.support_message import SupportMessage
+from utils.identity import resolve_identity
+from utils.typing_throttle import typing_throttle
+from utils.read_receipts import read_receipt_batcher
+from utils.fanout import fanout_pool
+from utils.support_inbox import (
+    get_ticket_list_for_support,
+    get_ticket_list_for_student,
+    get_ticket_summaries_for_support,
+    get_support_unread_total,
+    get_message_page,
+    message_to_dict,
+    message_list_to_dict,
+    record_new_message,
+    apply_read_receipts,
+    recount_ticket_counters,
+)
+
+
+SUPPORT_ROOM = "role_support"
+
+class SocketUser:
+    """Socket sessiyasida saqlanadigan user (DB obyekti emas)"""
+    __slots__ = ("id", "role", "username", "exp", "token", "claims")
+
+    def __init__(self, id, role, username, exp, token, claims):
+        self.id = id
+        self.role = role
+        self.username = username
+        self.exp = exp
+        self.token = token
+        self.claims = claims
 
 
 def register_socket_handlers(socketio):
 
+    # ================= AUTH (SOCKET SESSION) =================
+    def authenticate_socket(token):
+        """
+        Tokenni tekshiradi va user ma'lumotini Socket.IO sessiyasiga yozadi.
+        Har bir event uchun decode_token + User query qilinmaydi.
+        """
+        decoded = decode_token(token)
+        identity = resolve_identity(decoded["sub"], decoded)
+        if not identity:
+            return None
+
+        user = SocketUser(identity["user_id"], identity["role"], decoded["sub"], decoded.get("exp"), token, decoded)
+        session["socket_user"] = user
+        return user
+
+    def get_socket_user(data, role=None):
+        """
+        Sessiyadagi userni qaytaradi (token muddati arzon tekshiriladi).
+        Eski clientlar uchun: sessiya bo'lmasa (yoki boshqa token yuborilsa)
+        data["token"] bir marta tekshiriladi.
+        Rol har eventda resolve_identity orqali qayta olinadi (token_version, cache),
+        shuning uchun rol o'zgarishi / o'chirilish ochiq socketlarga ham yetadi.
+        """
+        user = session.get("socket_user")
+        token = data.get("token") if isinstance(data, dict) else None
+
+        if user and user.exp is not None and user.exp <= time.time():
+            session.pop("socket_user", None)
+            user = None
+
+        if token and (not user or user.token != token):
+            user = authenticate_socket(token)
+        elif user:
+            identity = resolve_identity(user.username, user.claims)
+            if not identity:
+                session.pop("socket_user", None)
+                return None
+            if user.role == "SUPPORT" and identity["role"] != "SUPPORT":
+                leave_room(SUPPORT_ROOM)
+            user.id = identity["user_id"]
+            user.role = identity["role"]
+
+        if not user or (role is not None and user.role != role):
+            return None
+        return user
+
     # ================= CONNECT =================
     @socketio.on("connect")
-    def connect():
+    def connect(auth=None):
+        # Token connect paytida (auth={"token": ...}) bir marta tekshiriladi
+        if isinstance(auth, dict) and auth.get("token"):
+            try:
+                with current_app.app_context():
+                    if not authenticate_socket(auth["token"]):
+                        return False
+            except Exception:
+                return False
+
         emit("connected", {"status": "ok"})
 
     @socketio.on("disconnect")
@@ -105,183 +190,74 @@ def register_socket_handlers(socketio):
     #     )
 
     
-    def get_ticket_list_for_support():
+    def broadcast_inbox_update(ticket_id_list):
         """
-        SUPPORT inbox
-        Ticketlar ICHIDAGI ENG OXIRGI MESSAGE vaqti bo‘yicha
-        (Telegram logikasi)
+        Support inbox real-time update (delta).
+        Faqat o'zgargan ticketlar va umumiy unread soni yuboriladi,
+        to'liq inbox faqat get_support_inbox orqali olinadi.
+        Bitta ticket ham, read receipt batchi ham bir xil "inbox_delta" eventi:
+        {"tickets": [...], "unread_count": N}
         """
 
-        # Har bir ticket uchun oxirgi message vaqtini topamiz
-        last_message_subquery = (
-            db.session.query(
-                SupportMessage.ticket_id.label("ticket_id"),
-                func.max(SupportMessage.created_at).label("last_message_time")
-            )
-            .group_by(SupportMessage.ticket_id)
-            .subquery()
-        )
-
-        # Ticketlarni oxirgi message vaqtiga qarab sort qilish
-        tickets = (
-            db.session.query(SupportTicket)
-            .outerjoin(
-                last_message_subquery,
-                SupportTicket.id == last_message_subquery.c.ticket_id
-            )
-            .order_by(
-                last_message_subquery.c.last_message_time.desc().nullslast(),
-                SupportTicket.updated_at.desc()
-            )
-            .all()
-        )
-
-        result = []
-        unread_total = 0
-
-        # Studentlarni bitta query bilan olish
-        student_ids = [t.student_id for t in tickets]
-        students = {
-            s.id: s
-            for s in User.query.filter(
-                User.id.in_(student_ids),
-                User.role == "STUDENT"
-            ).all()
+        inbox_delta = {
+            "tickets": get_ticket_summaries_for_support(ticket_id_list),
+            "unread_count": get_support_unread_total()
         }
 
-        for ticket in tickets:
-            unread = (
-                SupportMessage.query.filter(
-                    SupportMessage.ticket_id == ticket.id,
-                    SupportMessage.sender_role == "STUDENT",
-                    SupportMessage.is_read.is_(False)
-                ).count()
-            )
-            unread_total += unread
-
-            last_message = (
-                SupportMessage.query
-                .filter_by(ticket_id=ticket.id)
-                .order_by(SupportMessage.created_at.desc())
-                .first()
-            )
-
-            ticket_dict = SupportTicket.to_dict(ticket)
-            if last_message:
-                ticket_dict["last_message"] = SupportMessage.to_dict(last_message)
-
-            student = students.get(ticket.student_id)
-            ticket_dict["student"] = User.to_dict(student) if student else None
-
-            result.append(ticket_dict)
-
-        return {
-            "unread_count": unread_total,
-            "tickets": result
-        }
-
-
-    def get_ticket_list_for_student(student_id):
-        """
-        STUDENT inbox
-        Ticketlar oxirgi message bo‘yicha sort qilinadi
-        """
-
-        last_message_subquery = (
-            db.session.query(
-                SupportMessage.ticket_id.label("ticket_id"),
-                func.max(SupportMessage.created_at).label("last_message_time")
-            )
-            .group_by(SupportMessage.ticket_id)
-            .subquery()
-        )
-
-        tickets = (
-            db.session.query(SupportTicket)
-            .outerjoin(
-                last_message_subquery,
-                SupportTicket.id == last_message_subquery.c.ticket_id
-            )
-            .filter(SupportTicket.student_id == student_id)
-            .order_by(
-                last_message_subquery.c.last_message_time.desc().nullslast(),
-                SupportTicket.updated_at.desc()
-            )
-            .all()
+        # Barcha SUPPORT agentlar bitta room'da: payload bir marta serialize qilinadi
+        socketio.emit(
+            "inbox_delta",
+            inbox_delta,
+            room=SUPPORT_ROOM,
+            namespace="/"
         )
 
-        result = []
-        unread_total = 0
-
-        for ticket in tickets:
-            unread = (
-                SupportMessage.query.filter(
-                    SupportMessage.ticket_id == ticket.id,
-                    SupportMessage.sender_role == "SUPPORT",
-                    SupportMessage.is_read.is_(False)
-                ).count()
-            )
-            unread_total += unread
-
-            last_message = (
-                SupportMessage.query
-                .filter_by(ticket_id=ticket.id)
-                .order_by(SupportMessage.created_at.desc())
-                .first()
-            )
-
-            ticket_dict = SupportTicket.to_dict(ticket)
-            if last_message:
-                ticket_dict["last_message"] = SupportMessage.to_dict(last_message)
-
-            result.append(ticket_dict)
-
-        return {
-            "unread_count": unread_total,
-            "tickets": result
-        }
-
-
-    def broadcast_inbox_update():
-        """Support inbox real-time update"""
-
-        inbox_data = get_ticket_list_for_support()
-        support_users = User.query.filter_by(role="SUPPORT").all()
-
-        for support_user in support_users:
-            emit(
-                "inbox_updated",
-                inbox_data,
-                room=f"user_{support_user.id}",
-                namespace="/"
-            )
-
 
     def broadcast_student_tickets_update(student_id):
         """Student ticket list real-time update"""
 
         tickets_data = get_ticket_list_for_student(student_id)
-        emit(
+        socketio.emit(
             "tickets_updated",
             tickets_data,
             room=f"user_{student_id}",
             namespace="/"
         )
 
+    def broadcast_ticket_lists_update(ticket_id):
+        """Student ticket list va support inbox (fon workerida bajariladi)"""
+
+        ticket = SupportTicket.query.get(ticket_id)
+        if not ticket:
+            return
+
+        broadcast_student_tickets_update(ticket.student_id)
+        broadcast_inbox_update([ticket.id])
+
+    def schedule_ticket_lists_update(ticket_id):
+        """
+        Commitdan keyingi ticket list / inbox yangilanishini fon workeriga beradi,
+        sender javobni shu ishlar tugashini kutmasdan oladi.
+        Ish shu app contextida bajariladi va shu socketio orqali emit qilinadi.
+        """
+        fanout_pool.start(socketio.start_background_task)
+        fanout_pool.submit(ticket_id, current_app._get_current_object(), broadcast_ticket_lists_update, ticket_id)
+
     # ================= JOIN USER ROOM =================
     @socketio.on("join_user_room")
     def join_user_room(data):
         """User o'zining shaxsiy room'iga qo'shiladi (inbox updates uchun)"""
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 
                 if not user:
                     emit("socket_error", {"message": "User not found"})
                     return
                 
                 join_room(f"user_{user.id}")
+                if user.role == "SUPPORT":
+                    join_room(SUPPORT_ROOM)
                 emit("joined_user_room", {"user_id": user.id})
         except Exception as e:
             emit("socket_error", {"message": str(e)})
@@ -291,8 +267,7 @@ def register_socket_handlers(socketio):
     def join_ticket(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 ticket = SupportTicket.query.get(data["ticket_id"])
 
                 if not user or not ticket:
@@ -318,8 +293,7 @@ def register_socket_handlers(socketio):
     def create_ticket(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"], role="STUDENT").first()
+                user = get_socket_user(data, role="STUDENT")
 
                 if not user:
                     return {"status": "error", "message": "Student not found"}
@@ -339,23 +313,21 @@ def register_socket_handlers(socketio):
                     file_path=data.get("file_path"),
                 )
                 db.session.add(new_message)
+                db.session.flush()
                 
-                # Ticket updated_at ni yangilash
+                # Ticket updated_at va inbox counterlarini yangilash
                 new_ticket.updated_at = new_message.created_at
+                record_new_message(new_ticket, new_message)
+                ticket_id, message_id = new_ticket.id, new_message.id
                 db.session.commit()
-                db.session.refresh(new_ticket)
-                db.session.refresh(new_message)
 
-                # Student uchun ticket listni yangilash
-                broadcast_student_tickets_update(user.id)
-                
-                # Support userlar uchun inbox yangilash
-                broadcast_inbox_update()
+                # Student ticket listi va support inbox fon workerida yangilanadi
+                schedule_ticket_lists_update(ticket_id)
 
                 return {
                     "status": "ok",
-                    "ticket_id": new_ticket.id,
-                    "message_id": new_message.id
+                    "ticket_id": ticket_id,
+                    "message_id": message_id
                 }
 
         except Exception as e:
@@ -368,8 +340,7 @@ def register_socket_handlers(socketio):
     def send_message(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 ticket = SupportTicket.query.get(data["ticket_id"])
 
                 if not user or not ticket or ticket.status == "CLOSED":
@@ -391,27 +362,28 @@ def register_socket_handlers(socketio):
                     file_path=data.get("file_path"),
                 )
                 db.session.add(msg)
+                db.session.flush()
                 
-                # Ticket updated_at ni yangilash
+                # Ticket updated_at va inbox counterlarini yangilash
                 ticket.updated_at = msg.created_at
+                record_new_message(ticket, msg)
+
+                # Commitdan oldin (flush qilingan) qiymatlardan olinadi - refresh kerak emas
+                ticket_id = ticket.id
+                message_dict = message_to_dict(ticket, msg)
                 db.session.commit()
-                db.session.refresh(msg)
-                db.session.refresh(ticket)
 
-                # Ticket room'dagi barchaga yangi xabarni yuborish
+                # Ticket room'dagi barchaga yangi xabarni yuborish (tartib saqlanishi uchun shu yerda)
                 emit(
                     "new_message",
-                    SupportMessage.to_dict(msg),
-                    room=f"ticket_{ticket.id}",
+                    message_dict,
+                    room=f"ticket_{ticket_id}",
                 )
 
-                # Student uchun ticket listni yangilash
-                broadcast_student_tickets_update(ticket.student_id)
-                
-                # Support userlar uchun inbox yangilash
-                broadcast_inbox_update()
+                # Student ticket listi va support inbox fon workerida yangilanadi
+                schedule_ticket_lists_update(ticket_id)
 
-                return {"status": "ok", "message_id": msg.id}
+                return {"status": "ok", "message_id": message_dict["id"]}
 
         except Exception as e:
             db.session.rollback()
@@ -423,8 +395,7 @@ def register_socket_handlers(socketio):
     def edit_message(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 
                 if not user:
                     return {"status": "error", "message": "User not found"}
@@ -441,22 +412,19 @@ def register_socket_handlers(socketio):
                 # Xabarni yangilash
                 message.message = data.get("message")
                 message.is_edited = True
-                db.session.commit()
-                db.session.refresh(message)
-
                 ticket = SupportTicket.query.get(message.ticket_id)
+                message_dict = message_to_dict(ticket, message)
+                db.session.commit()
 
                 # Ticket room'dagi barchaga edited message yuborish
                 emit(
                     "message_edited",
-                    SupportMessage.to_dict(message),
-                    room=f"ticket_{message.ticket_id}",
+                    message_dict,
+                    room=f"ticket_{message_dict['ticket_id']}",
                 )
 
-                # Ticket listlarni yangilash
-                if ticket:
-                    broadcast_student_tickets_update(ticket.student_id)
-                    broadcast_inbox_update()
+                # Ticket listlarni yangilash (fon workerida)
+                schedule_ticket_lists_update(message_dict["ticket_id"])
 
                 return {"status": "ok", "message": "Message updated"}
 
@@ -470,8 +438,7 @@ def register_socket_handlers(socketio):
     def delete_message(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 
                 if not user:
                     return {"status": "error", "message": "User not found"}
@@ -488,10 +455,12 @@ def register_socket_handlers(socketio):
                 ticket_id = message.ticket_id
                 message_id = message.id
                 
-                ticket = SupportTicket.query.get(ticket_id)
-                
                 # Xabarni o'chirish
                 db.session.delete(message)
+                db.session.flush()
+
+                # Inbox counterlari va oxirgi xabarni qayta hisoblash
+                recount_ticket_counters([ticket_id])
                 db.session.commit()
 
                 # Ticket room'dagi barchaga deleted message yuborish
@@ -501,10 +470,8 @@ def register_socket_handlers(socketio):
                     room=f"ticket_{ticket_id}",
                 )
 
-                # Ticket listlarni yangilash
-                if ticket:
-                    broadcast_student_tickets_update(ticket.student_id)
-                    broadcast_inbox_update()
+                # Ticket listlarni yangilash (fon workerida)
+                schedule_ticket_lists_update(ticket_id)
 
                 return {"status": "ok", "message": "Message deleted"}
 
@@ -518,8 +485,7 @@ def register_socket_handlers(socketio):
     def get_support_inbox(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"], role="SUPPORT").first()
+                user = get_socket_user(data, role="SUPPORT")
 
                 if not user:
                     return {"status": "error", "message": "Access denied"}
@@ -541,8 +507,7 @@ def register_socket_handlers(socketio):
     def get_messages(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
 
                 if not user:
                     return {"status": "error", "message": "User not found"}
@@ -556,13 +521,19 @@ def register_socket_handlers(socketio):
                 if user.role == "STUDENT" and ticket.student_id != user.id:
                     return {"status": "error", "message": "Access denied"}
 
-                messages = SupportMessage.query.filter_by(
-                    ticket_id=ticket.id
-                ).order_by(SupportMessage.created_at.asc()).all()
+                # Tarix sahifalab: eng yangi sahifa birinchi, keyingisi uchun before_id
+                before_id = data.get("before_id")
+                limit = data.get("limit")
+                messages, next_before_id = get_message_page(
+                    ticket.id,
+                    int(before_id) if before_id else None,
+                    int(limit) if limit else None
+                )
 
                 return {
                     "status": "ok",
-                    "messages": [SupportMessage.to_dict(msg) for msg in messages]
+                    "messages": message_list_to_dict(ticket, messages),
+                    "next_before_id": next_before_id
                 }
 
         except Exception as e:
@@ -574,8 +545,7 @@ def register_socket_handlers(socketio):
     def get_student_tickets(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"], role="STUDENT").first()
+                user = get_socket_user(data, role="STUDENT")
 
                 if not user:
                     return {"status": "error", "message": "Student not found"}
@@ -593,12 +563,64 @@ def register_socket_handlers(socketio):
             return {"status": "error", "message": str(e)}
 
     # ================= MARK AS READ =================
+    # Read receiptlar qisqa oyna davomida yig'iladi va fon vazifasida
+    # har bir tomon uchun bitta UPDATE + bitta delta emit bilan yoziladi
+    read_receipt_flusher = {"started": False}
+
+    def flush_read_receipts(app):
+        while True:
+            socketio.sleep(read_receipt_batcher.window)
+            pending = read_receipt_batcher.drain()
+            if not pending:
+                continue
+
+            with app.app_context():
+                try:
+                    read_up_to_by_role = {"STUDENT": {}, "SUPPORT": {}}
+                    for (reader_role, reader_id), read_up_to_map in pending.items():
+                        side = "STUDENT" if reader_role == "STUDENT" else "SUPPORT"
+                        for ticket_id, read_up_to in read_up_to_map.items():
+                            if read_up_to > read_up_to_by_role[side].get(ticket_id, 0):
+                                read_up_to_by_role[side][ticket_id] = read_up_to
+
+                    for side, read_up_to_map in read_up_to_by_role.items():
+                        apply_read_receipts(side, read_up_to_map)
+                    db.session.commit()
+
+                    # Ticket room'dagilarga: qaysi xabargacha o'qildi
+                    for side, read_up_to_map in read_up_to_by_role.items():
+                        for ticket_id, read_up_to in read_up_to_map.items():
+                            socketio.emit(
+                                "messages_read",
+                                {
+                                    "ticket_id": ticket_id,
+                                    "reader_role": side,
+                                    "read_up_to": read_up_to
+                                },
+                                room=f"ticket_{ticket_id}",
+                                namespace="/"
+                            )
+
+                    # Ticket listlarni yangilash
+                    if read_up_to_by_role["SUPPORT"]:
+                        broadcast_inbox_update(list(read_up_to_by_role["SUPPORT"]))
+                    for reader_role, reader_id in pending:
+                        if reader_role == "STUDENT":
+                            broadcast_student_tickets_update(reader_id)
+                except Exception as e:
+                    db.session.rollback()
+                    print("❌ READ RECEIPTS ERROR:", str(e))
+
+    def start_read_receipt_flusher():
+        if not read_receipt_flusher["started"]:
+            read_receipt_flusher["started"] = True
+            socketio.start_background_task(flush_read_receipts, current_app._get_current_object())
+
     @socketio.on("mark_as_read")
     def mark_as_read(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 
                 if not user:
                     return {"status": "error", "message": "User not found"}
@@ -608,39 +630,65 @@ def register_socket_handlers(socketio):
                 if not ticket:
                     return {"status": "error", "message": "Ticket not found"}
 
-                # Faqat qarshi tomondan kelgan xabarlarni o'qilgan qilish
-                SupportMessage.query.filter(
-                    SupportMessage.ticket_id == data["ticket_id"],
-                    SupportMessage.sender_role != user.role,
-                    SupportMessage.is_read == False,
-                ).update({"is_read": True})
+                if user.role == "STUDENT" and ticket.student_id != user.id:
+                    return {"status": "error", "message": "Access denied"}
 
-                db.session.commit()
+                # Qarshi tomon xabarlari shu xabargacha o'qilgan (berilmasa oxirgi xabargacha)
+                read_up_to = ticket.last_message_id or 0
+                if data.get("message_id"):
+                    read_up_to = min(int(data["message_id"]), read_up_to)
 
-                # Ticket listlarni yangilash
-                if user.role == "STUDENT":
-                    broadcast_student_tickets_update(user.id)
-                else:
-                    broadcast_inbox_update()
+                start_read_receipt_flusher()
+                read_receipt_batcher.add(user.role, user.id, ticket.id, read_up_to)
 
-                return {"status": "ok"}
+                return {"status": "ok", "read_up_to": read_up_to}
 
         except Exception as e:
-            db.session.rollback()
             print("❌ MARK AS READ ERROR:", str(e))
             return {"status": "error", "message": str(e)}
 
     # ================= TYPING INDICATORS =================
+    # Typing eventlari (user, ticket) bo'yicha throttle qilinadi, stop_typing
+    # kelmasa holat fon vazifasi orqali avtomatik o'chiriladi
+    typing_sweeper = {"started": False}
+
+    def emit_stop_typing(user_id, role, ticket_id, **kwargs):
+        socketio.emit(
+            "user_stop_typing",
+            {
+                "user_id": user_id,
+                "role": role,
+                "ticket_id": ticket_id
+            },
+            room=f"ticket_{ticket_id}",
+            namespace="/",
+            **kwargs
+        )
+
+    def sweep_expired_typing():
+        while True:
+            socketio.sleep(1)
+            for (user_id, ticket_id), role in typing_throttle.pop_expired():
+                emit_stop_typing(user_id, role, ticket_id)
+
+    def start_typing_sweeper():
+        if not typing_sweeper["started"]:
+            typing_sweeper["started"] = True
+            socketio.start_background_task(sweep_expired_typing)
+
     @socketio.on("typing")
     def typing(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
                 
                 if not user:
                     return
 
+                start_typing_sweeper()
+                if not typing_throttle.start(user.id, data["ticket_id"], user.role):
+                    return
+
                 emit(
                     "user_typing",
                     {
@@ -657,12 +705,13 @@ def register_socket_handlers(socketio):
     @socketio.on("stop_typing")
     def stop_typing(data):
         try:
-            emit(
-                "user_stop_typing",
-                {"ticket_id": data.get("ticket_id")},
-                room=f"ticket_{data['ticket_id']}",
-                include_self=False,
-            )
+            with current_app.app_context():
+                user = get_socket_user(data)
+
+                if not user or not typing_throttle.stop(user.id, data["ticket_id"]):
+                    return
+
+                emit_stop_typing(user.id, user.role, data["ticket_id"], skip_sid=request.sid)
         except Exception as e:
             print("❌ STOP TYPING ERROR:", str(e))
 
@@ -671,8 +720,7 @@ def register_socket_handlers(socketio):
     def close_ticket(data):
         try:
             with current_app.app_context():
-                decoded = decode_token(data["token"])
-                user = User.query.filter_by(username=decoded["sub"]).first()
+                user = get_socket_user(data)
 
                 if not user or user.role != "SUPPORT":
                     return {"status": "error", "message": "Access denied"}
@@ -683,18 +731,18 @@ def register_socket_handlers(socketio):
                     return {"status": "error", "message": "Ticket not found"}
 
                 ticket.status = "CLOSED"
+                ticket_id = ticket.id
                 db.session.commit()
 
                 # Ticket room'dagi barchaga ticket closed yuborish
                 emit(
                     "ticket_closed",
-                    {"ticket_id": ticket.id},
-                    room=f"ticket_{ticket.id}",
+                    {"ticket_id": ticket_id},
+                    room=f"ticket_{ticket_id}",
                 )
 
-                # Ticket listlarni yangilash
-                broadcast_student_tickets_update(ticket.student_id)
-                broadcast_inbox_update()
+                # Ticket listlarni yangilash (fon workerida)
+                schedule_ticket_lists_update(ticket_id)
 
                 return {"status": "ok", "message": "Ticket closed"}
 
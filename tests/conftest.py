@@ -0,0 +1,120 @@
+import os
+import sys
+import pytest
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from flask import Flask
+from sqlalchemy import event
+from models import db, bcrypt, jwt
+from models.type import Type
+from models.user import User
+from utils import identity
+from utils.grading import answer_key_cache
+from utils.catalog_cache import catalog_cache, LocalCacheBackend, CATALOG_CACHE_MAX_SIZE
+from utils.conditional_get import ensure_catalog_versions
+
+from routes.auth_route import auth_bp
+from routes.user_route import user_bp
+from routes.type_route import type_bp
+from routes.news_route import news_bp
+from routes.course_route import course_bp
+from routes.lesson_route import lesson_bp
+from routes.language_route import language_bp
+from routes.module_test_route import module_test_bp
+from routes.lesson_test_route import lesson_test_bp
+from routes.course_save_route import course_save_bp
+from routes.certificate_route import certificate_bp
+from routes.notification_route import notification_bp
+from routes.course_module_route import course_module_bp
+from routes.support_ticket_route import support_ticket_bp
+from routes.meeting_lesson_route import meeting_lesson_bp
+from routes.course_content_route import course_content_bp
+from routes.lesson_material_route import lesson_material_bp
+from routes.notification_user_route import notification_user_bp
+
+BLUEPRINT_LIST = [
+    auth_bp, user_bp, type_bp, news_bp, course_bp, lesson_bp, language_bp, module_test_bp,
+    lesson_test_bp, course_save_bp, certificate_bp, notification_bp, course_module_bp,
+    support_ticket_bp, meeting_lesson_bp, course_content_bp, lesson_material_bp, notification_user_bp
+]
+
+USER_PASSWORD = "password"
+
+def create_test_app(database_uri="sqlite://"):
+    """To'liq REST app (blueprintlar ro'yxatdan o'tgan), DB yaratilmaydi"""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY="test-secret-key",
+        JWT_SECRET_KEY="test-jwt-secret-key-0123456789abcdef",
+        JWT_ACCESS_TOKEN_EXPIRES=10800,
+        SQLALCHEMY_DATABASE_URI=database_uri,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False
+    )
+    db.init_app(app)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    for blueprint in BLUEPRINT_LIST:
+        app.register_blueprint(blueprint)
+    return app
+
+def seed_database():
+    """Jadvallar, katalog versiyalari, type va admin/student/support userlar"""
+    db.create_all()
+    ensure_catalog_versions()
+
+    user_type = Type("ALL", "All courses")
+    db.session.add(user_type)
+    db.session.commit()
+
+    for index, role in enumerate(["ADMIN", "STUDENT", "SUPPORT"]):
+        db.session.add(User(role.title(), f"+99890000000{index}", role.lower(), USER_PASSWORD, role, 12, user_type.id))
+    db.session.commit()
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # Process ichidagi cache lar testlar orasida bo'lishilmasin
+    identity._identity_cache.clear()
+    answer_key_cache.clear()
+    catalog_cache.set_backend(LocalCacheBackend(CATALOG_CACHE_MAX_SIZE))
+
+@pytest.fixture
+def app():
+    """Postgres o'rniga SQLite (xotirada) bilan to'liq REST app"""
+    app = create_test_app()
+
+    with app.app_context():
+        seed_database()
+
+        yield app
+
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def auth_header(client, username):
+    response = client.post("/api/auth/login", json={"username": username, "password": USER_PASSWORD})
+    return {"Authorization": "Bearer " + response.json["result"]["access_token"]}
+
+def get_user(username):
+    return User.query.filter_by(username=username).first()
+
+@contextmanager
+def count_queries():
+    """Blok ichida bajarilgan SQL statementlar ro'yxati (before_cursor_execute orqali)"""
+    statement_list = []
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        statement_list.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statement_list
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,53 @@
+import pytest
+from models import db
+from utils.conditional_get import bump_catalog_version
+from utils.catalog_cache import CatalogCache, LocalCacheBackend, catalog_cache, catalog_cache_backend
+
+def test_local_backend_bounded_by_bytes(app):
+    backend = LocalCacheBackend(max_size=100, max_bytes=20000)
+    catalog_cache = CatalogCache(backend, check_interval=60)
+
+    for index in range(20):
+        catalog_cache.get_or_load(f"item:{index}", lambda: {"text": "x" * 3000})
+
+    stats = backend.stats()
+    assert stats["bytes"] <= 20000
+    assert stats["size"] < 20
+    assert stats["evictions"] == 20 - stats["size"]
+
+    # Eng oxirgi yozuvlar qoladi (LRU)
+    assert catalog_cache.get_or_load("item:19", lambda: None) is not None
+
+def test_local_backend_skips_oversized_values(app):
+    backend = LocalCacheBackend(max_size=100, max_bytes=1000)
+    catalog_cache = CatalogCache(backend, check_interval=60)
+
+    assert catalog_cache.get_or_load("large", lambda: {"text": "x" * 5000})["text"]
+    stats = backend.stats()
+    assert stats["size"] == 0
+    assert stats["oversized"] == 1
+
+def load_counter():
+    load_list = []
+    return load_list, lambda: load_list.append(1) or {"loaded": len(load_list)}
+
+@pytest.mark.parametrize("cache_url", [None, "local://"])
+def test_only_tree_resources_evict_course_trees(app, cache_url):
+    catalog_cache.set_backend(catalog_cache_backend(cache_url))
+    load_list, loader = load_counter()
+
+    catalog_cache.get_or_load("course:1", loader)
+    news_version = catalog_cache.get_versions()["news"]
+
+    # News o'zgarishi: versiyalar yangilanadi, daraxt cache da qoladi
+    bump_catalog_version("news")
+    db.session.commit()
+    assert catalog_cache.get_versions()["news"] == news_version + 1
+    catalog_cache.get_or_load("course:1", loader)
+    assert len(load_list) == 1
+
+    # Dars o'zgarishi: daraxt qayta yuklanadi
+    bump_catalog_version("lesson")
+    db.session.commit()
+    catalog_cache.get_or_load("course:1", loader)
+    assert len(load_list) == 2
@@ -0,0 +1,92 @@
+import re
+from models import db
+from models.news import News
+from models.course import Course
+from models.lesson import Lesson
+from models.course_module import CourseModule
+from conftest import auth_header, count_queries
+
+LESSON_TEXT_COLUMN_SET = {"description", "content"}
+
+def selected_columns(statement_list, table_name):
+    """SELECT lardagi berilgan jadval ustunlari (har bir statement uchun set)"""
+    column_set_list = []
+    for statement in statement_list:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        select_clause = re.split(r"\bFROM\b", statement, maxsplit=1)[0]
+        column_set = {column.strip('"') for column in re.findall(rf'\b{table_name}\.("?\w+"?)', select_clause)}
+        if column_set:
+            column_set_list.append(column_set)
+    return column_set_list
+
+def seed_catalog():
+    course = Course("Course", "Long course description", "image.png", "A1", 1)
+    db.session.add(course)
+    db.session.flush()
+
+    course_module = CourseModule(course.id, "Module", "Description", 1)
+    db.session.add(course_module)
+    db.session.flush()
+
+    for lesson_index in range(3):
+        db.session.add(Lesson(course_module.id, f"Lesson {lesson_index}", "Long description", "video", "Long content", "00:10:00", lesson_index + 1, "cover"))
+
+    db.session.add(News("News", "Description", "Long news content", "file.pdf", "image.png"))
+    db.session.commit()
+    return course.id, course_module.id, Lesson.query.first().id
+
+def request_columns(client, url, headers, table_name):
+    with count_queries() as statement_list:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response, selected_columns(statement_list, table_name)
+
+def test_default_queries_skip_deferred_text_columns(app):
+    assert not LESSON_TEXT_COLUMN_SET & set(selected_columns([str(Lesson.query.statement)], "lesson")[0])
+    assert "description" not in selected_columns([str(Course.query.statement)], "course")[0]
+    assert "content" not in selected_columns([str(News.query.statement)], "news")[0]
+
+def test_lesson_list_and_detail_columns(app, client):
+    course_id, course_module_id, lesson_id = seed_catalog()
+    headers = auth_header(client, "admin")
+
+    response, column_set_list = request_columns(client, f"/api/lesson/course_module/{course_module_id}?fields=title,order", headers, "lesson")
+    assert column_set_list == [{"id", "order", "title"}]
+    assert set(response.json["result"][0]) == {"title", "order", "lesson_test_progress"}
+
+    # fields berilmasa to'liq to_dict qaytadi - Text ustunlar ham kerak
+    response, column_set_list = request_columns(client, f"/api/lesson/course_module/{course_module_id}", headers, "lesson")
+    assert LESSON_TEXT_COLUMN_SET <= column_set_list[0]
+    assert response.json["result"][0]["content"] == "Long content"
+
+    response, column_set_list = request_columns(client, f"/api/lesson/{lesson_id}", headers, "lesson")
+    assert LESSON_TEXT_COLUMN_SET <= column_set_list[0]
+
+def test_course_and_news_list_columns(app, client):
+    seed_catalog()
+    headers = auth_header(client, "admin")
+
+    response, column_set_list = request_columns(client, "/api/course/?fields=title", headers, "course")
+    assert column_set_list == [{"id", "created_at", "title"}]
+
+    response, column_set_list = request_columns(client, "/api/news/?fields=title", headers, "news")
+    assert column_set_list == [{"id", "created_at", "title"}]
+
+    response, column_set_list = request_columns(client, "/api/news/", headers, "news")
+    assert "content" in column_set_list[0]
+
+def test_course_detail_tree_skips_lesson_text(app, client):
+    course_id, course_module_id, lesson_id = seed_catalog()
+    headers = auth_header(client, "student")
+
+    # Cache bo'sh - kurs daraxti quriladi
+    response, column_set_list = request_columns(client, f"/api/course/{course_id}", headers, "lesson")
+    assert column_set_list
+    for column_set in column_set_list:
+        assert not LESSON_TEXT_COLUMN_SET & column_set
+    assert response.json["result"]["description"] == "Long course description"
+
+    response = client.get(f"/api/course/tree/{course_id}", headers=auth_header(client, "admin"))
+    lesson_dict = response.json["result"]["modules"][0]["lessons"][0]
+    assert not LESSON_TEXT_COLUMN_SET & set(lesson_dict)
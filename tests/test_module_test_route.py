@@ -0,0 +1,63 @@
+from models import db
+from models.course import Course
+from models.lesson import Lesson
+from models.module_test import ModuleTest
+from models.course_module import CourseModule
+from models.lesson_test_progress import LessonTestProgress
+from models.module_test_progress import ModuleTestProgress
+from conftest import auth_header, count_queries, get_user
+
+def seed_modules(module_count, student_id, title="Course"):
+    """Har bir modulda 3 ta dars va 2 ta test; juft modullarning oxirgi darsi tugatilgan"""
+    course = Course(title, "Description", "image.png", "A1", 1)
+    db.session.add(course)
+    db.session.flush()
+
+    for module_index in range(module_count):
+        course_module = CourseModule(course.id, f"Module {module_index}", "Description", module_index + 1)
+        db.session.add(course_module)
+        db.session.flush()
+
+        for lesson_index in range(3):
+            lesson = Lesson(course_module.id, f"{title} lesson {module_index}-{lesson_index}", "Description", "video", "content", "00:10:00", module_index * 3 + lesson_index + 1, "cover")
+            db.session.add(lesson)
+        db.session.flush()
+
+        for test_index in range(2):
+            db.session.add(ModuleTest(course_module.id, f"Question {test_index}", "a", "b", "c", "d", "A"))
+
+        if module_index % 2 == 0:
+            db.session.add(LessonTestProgress(student_id, lesson.id, True, 10))
+            db.session.add(ModuleTestProgress(student_id, course_module.id, module_index % 4 == 0, 30))
+    db.session.commit()
+
+def module_list_queries(client, headers):
+    # Identity cache ni isitish (birinchi so'rov)
+    client.get("/api/module_test/list/action", headers=headers)
+    with count_queries() as statement_list:
+        response = client.get("/api/module_test/list/action", headers=headers)
+    return response, statement_list
+
+def test_module_test_list_query_count_does_not_grow(app, client):
+    student_id = get_user("student").id
+    headers = auth_header(client, "student")
+
+    seed_modules(2, student_id)
+    response, small_statement_list = module_list_queries(client, headers)
+    assert len(response.json["result"]) == 2
+
+    seed_modules(10, student_id, "Second course")
+    response, large_statement_list = module_list_queries(client, headers)
+    assert len(response.json["result"]) == 12
+
+    assert len(large_statement_list) == len(small_statement_list)
+    assert len(large_statement_list) <= 4
+
+def test_module_test_list_flags(app, client):
+    student_id = get_user("student").id
+    headers = auth_header(client, "student")
+    seed_modules(4, student_id)
+
+    response = client.get("/api/module_test/list/action", headers=headers)
+    flag_list = [(item["is_open"], item["is_passed"]) for item in response.json["result"]]
+    assert flag_list == [(True, True), (False, False), (True, False), (False, False)]
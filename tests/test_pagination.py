@@ -0,0 +1,38 @@
+from models import db
+from models.type import Type
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from conftest import auth_header
+
+def seed_types(count):
+    db.session.add_all([Type(f"Type {index}", "Pagination") for index in range(count)])
+    db.session.commit()
+
+def test_list_without_params_returns_default_page_and_cursor(app, client):
+    seed_types(120)
+    headers = auth_header(client, "admin")
+
+    response = client.get("/api/type/", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json["result"]) == DEFAULT_PAGE_SIZE
+    assert response.json["next_cursor"]
+
+    # Cursor bo'yicha yurib barcha qatorlar bir martadan olinadi
+    id_list = [item["id"] for item in response.json["result"]]
+    next_cursor = response.json["next_cursor"]
+    while next_cursor:
+        response = client.get(f"/api/type/?after={next_cursor}", headers=headers)
+        id_list += [item["id"] for item in response.json["result"]]
+        next_cursor = response.json.get("next_cursor")
+    assert sorted(id_list) == sorted(type.id for type in Type.query.all())
+
+def test_limit_is_capped(app, client):
+    seed_types(MAX_PAGE_SIZE + 10)
+    headers = auth_header(client, "admin")
+
+    response = client.get(f"/api/type/?limit={MAX_PAGE_SIZE * 10}", headers=headers)
+    assert len(response.json["result"]) == MAX_PAGE_SIZE
+    assert response.json["next_cursor"]
+
+def test_invalid_cursor(app, client):
+    response = client.get("/api/type/?after=not-a-cursor", headers=auth_header(client, "admin"))
+    assert response.status_code == 400
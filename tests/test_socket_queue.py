@@ -0,0 +1,64 @@
+import uuid
+import pytest
+from flask_socketio import SocketIO
+from models import db
+from utils.socket_queue import socketio_queue_options
+from sockets.support_chat import register_socket_handlers
+from conftest import create_test_app, seed_database, auth_header
+
+def create_worker(database_uri, channel):
+    """Bitta "worker": alohida Flask app + SocketIO server, umumiy DB va local:// bus"""
+    app = create_test_app(database_uri)
+    socketio = SocketIO(app, async_mode="threading", **socketio_queue_options("local://", channel=channel))
+    register_socket_handlers(socketio)
+    return app, socketio
+
+@pytest.fixture
+def database_uri(tmp_path):
+    # Workerlar bitta DB ni ko'rishi uchun fayldagi SQLite
+    database_uri = f"sqlite:///{tmp_path / 'socket_queue.db'}"
+    app = create_test_app(database_uri)
+    with app.app_context():
+        seed_database()
+        db.session.remove()
+    return database_uri
+
+def connect(worker, username):
+    app, socketio = worker
+    token = auth_header(app.test_client(), username)["Authorization"].split(" ", 1)[1]
+    socket_client = socketio.test_client(app, auth={"token": token})
+    assert socket_client.is_connected()
+    return socket_client
+
+def received_events(socket_client, event_name):
+    return [item["args"][0] for item in socket_client.get_received() if item["name"] == event_name]
+
+def open_ticket(student_client, support_client):
+    ticket_id = student_client.emit("create_ticket", {"message": "Hello"}, callback=True)["ticket_id"]
+    student_client.emit("join_ticket", {"ticket_id": ticket_id})
+    support_client.emit("join_ticket", {"ticket_id": ticket_id})
+    student_client.get_received()
+    support_client.get_received()
+    return ticket_id
+
+def test_room_emit_reaches_client_on_other_worker(database_uri):
+    channel = f"test-{uuid.uuid4().hex}"
+    student_client = connect(create_worker(database_uri, channel), "student")
+    support_client = connect(create_worker(database_uri, channel), "support")
+    ticket_id = open_ticket(student_client, support_client)
+
+    response = student_client.emit("send_message", {"ticket_id": ticket_id, "message": "From worker 1"}, callback=True)
+    assert response["status"] == "ok"
+
+    # Xabar har bir clientga bir martadan yetadi: o'z workerida lokal, boshqasida bus orqali
+    assert [message["message"] for message in received_events(support_client, "new_message")] == ["From worker 1"]
+    assert [message["message"] for message in received_events(student_client, "new_message")] == ["From worker 1"]
+
+def test_workers_on_other_channel_do_not_receive(database_uri):
+    student_client = connect(create_worker(database_uri, f"test-{uuid.uuid4().hex}"), "student")
+    support_client = connect(create_worker(database_uri, f"test-{uuid.uuid4().hex}"), "support")
+    ticket_id = open_ticket(student_client, support_client)
+
+    student_client.emit("send_message", {"ticket_id": ticket_id, "message": "Private"}, callback=True)
+    assert received_events(support_client, "new_message") == []
+    assert [message["message"] for message in received_events(student_client, "new_message")] == ["Private"]
@@ -0,0 +1,67 @@
+import time
+from flask_socketio import SocketIO
+from sockets.support_chat import register_socket_handlers
+from conftest import create_test_app, seed_database, auth_header
+
+def connect(app, socketio, client, username):
+    token = auth_header(client, username)["Authorization"].split(" ", 1)[1]
+    socket_client = socketio.test_client(app, auth={"token": token})
+    assert socket_client.is_connected()
+    return socket_client
+
+def wait_for_events(socket_client, event_name, until, timeout=3):
+    """Fon vazifalari emit qilgan eventlarni until(payload) bajarilguncha yig'adi"""
+    event_list = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        event_list += [item["args"][0] for item in socket_client.get_received() if item["name"] == event_name]
+        if any(until(payload) for payload in event_list):
+            break
+        time.sleep(0.05)
+    return event_list
+
+def test_read_receipts_use_the_inbox_delta_shape(app, client):
+    socketio = SocketIO(app, async_mode="threading")
+    register_socket_handlers(socketio)
+    student_client = connect(app, socketio, client, "student")
+    support_client = connect(app, socketio, client, "support")
+    support_client.emit("join_user_room", {})
+
+    ticket_id = student_client.emit("create_ticket", {"message": "Hello"}, callback=True)["ticket_id"]
+    student_client.emit("send_message", {"ticket_id": ticket_id, "message": "Second"}, callback=True)
+    support_client.get_received()
+
+    response = support_client.emit("mark_as_read", {"ticket_id": ticket_id}, callback=True)
+    assert response["status"] == "ok"
+
+    # Batch ham bitta ticket yangilanishi bilan bir xil: "inbox_delta", {"tickets": [...], "unread_count": N}
+    # (yangi xabar uchun fanout workeridan kelgan delta ham shu shaklda)
+    inbox_delta_list = wait_for_events(support_client, "inbox_delta", lambda payload: payload["unread_count"] == 0)
+    for inbox_delta in inbox_delta_list:
+        assert set(inbox_delta) == {"tickets", "unread_count"}
+        assert [ticket["id"] for ticket in inbox_delta["tickets"]] == [ticket_id]
+    assert inbox_delta_list[-1]["unread_count"] == 0
+    assert inbox_delta_list[-1]["tickets"][0]["unread_count"] == 0
+
+def test_fanned_out_updates_reach_every_app(app, client):
+    # Ikkinchi app (alohida DB va SocketIO) - fanout pool birinchi ishga tushirgan app ga bog'lanib qolmasligi kerak
+    other_app = create_test_app()
+    with other_app.app_context():
+        seed_database()
+
+    for worker_app, worker_client in [(app, client), (other_app, other_app.test_client())]:
+        with worker_app.app_context():
+            socketio = SocketIO(worker_app, async_mode="threading")
+            register_socket_handlers(socketio)
+            student_client = connect(worker_app, socketio, worker_client, "student")
+            support_client = connect(worker_app, socketio, worker_client, "support")
+            student_client.emit("join_user_room", {})
+            support_client.emit("join_user_room", {})
+
+            ticket_id = student_client.emit("create_ticket", {"message": "Hello"}, callback=True)["ticket_id"]
+            student_client.emit("send_message", {"ticket_id": ticket_id, "message": "Second"}, callback=True)
+
+            inbox_delta_list = wait_for_events(support_client, "inbox_delta", lambda payload: payload["unread_count"] == 2)
+            assert inbox_delta_list and inbox_delta_list[-1]["unread_count"] == 2
+            assert [ticket["id"] for ticket in inbox_delta_list[-1]["tickets"]] == [ticket_id]
+            assert wait_for_events(student_client, "tickets_updated", lambda payload: True)
@@ -0,0 +1,83 @@
+from models import db
+from models.user import User
+from models.support_ticket import SupportTicket
+from models.support_message import SupportMessage
+from utils.support_inbox import record_new_message, get_ticket_summaries_for_support
+from conftest import auth_header, count_queries, get_user
+
+def seed_tickets(ticket_count, message_count=3):
+    """ticket_count ta student, har birida bitta ticket va message_count ta xabar"""
+    support = get_user("support")
+    ticket_id_list = []
+    user_offset = User.query.count()
+
+    for ticket_index in range(ticket_count):
+        student = User(f"Student {ticket_index}", f"+99891{user_offset + ticket_index:07d}", f"inbox_student_{user_offset + ticket_index}", "password", "STUDENT", 12, 1)
+        db.session.add(student)
+        db.session.flush()
+
+        ticket = SupportTicket(student.id, "OPEN")
+        db.session.add(ticket)
+        db.session.flush()
+
+        for message_index in range(message_count):
+            if message_index % 2 == 0:
+                message = SupportMessage(ticket.id, student.id, "STUDENT", f"Question {message_index}")
+            else:
+                message = SupportMessage(ticket.id, support.id, "SUPPORT", f"Answer {message_index}")
+            db.session.add(message)
+            record_new_message(ticket, message)
+        ticket_id_list.append(ticket.id)
+
+    db.session.commit()
+    return ticket_id_list
+
+def inbox_queries(client, url, headers):
+    # Identity cache ni isitish (birinchi so'rov)
+    client.get(url, headers=headers)
+    with count_queries() as statement_list:
+        response = client.get(url, headers=headers)
+    return response, statement_list
+
+def test_support_inbox_query_count_does_not_grow(app, client):
+    headers = auth_header(client, "support")
+
+    seed_tickets(2)
+    response, small_statement_list = inbox_queries(client, "/api/support/ticket/inbox", headers)
+    assert len(response.json["result"]["tickets"]) == 2
+
+    seed_tickets(10)
+    response, large_statement_list = inbox_queries(client, "/api/support/ticket/inbox", headers)
+    result = response.json["result"]
+    assert len(result["tickets"]) == 12
+    assert result["unread_count"] == 12 * 2
+
+    assert len(large_statement_list) == len(small_statement_list) == 1
+
+def test_student_ticket_list_query_count(app, client):
+    student = get_user("student")
+    headers = auth_header(client, "student")
+
+    ticket = SupportTicket(student.id, "OPEN")
+    db.session.add(ticket)
+    db.session.flush()
+    message = SupportMessage(ticket.id, get_user("support").id, "SUPPORT", "Hello")
+    db.session.add(message)
+    record_new_message(ticket, message)
+    db.session.commit()
+
+    response, statement_list = inbox_queries(client, "/api/support/ticket/", headers)
+    result = response.json["result"]
+    assert result["unread_count"] == 1
+    assert result["tickets"][0]["last_message"]["message"] == "Hello"
+    # student lookup + ticket list
+    assert len(statement_list) == 2
+
+def test_ticket_summaries_single_query(app):
+    ticket_id_list = seed_tickets(15)
+
+    with count_queries() as statement_list:
+        summary_list = get_ticket_summaries_for_support(ticket_id_list)
+
+    assert len(summary_list) == 15
+    assert len(statement_list) == 1
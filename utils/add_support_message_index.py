@@ -0,0 +1,20 @@
+import os
+import sys
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models import db
+from utils.migration import create_migration_app
+from sqlalchemy import text
+
+app = create_migration_app()
+
+with app.app_context():
+    # Xabarlar tarixini sahifalash uchun (ticket_id, created_at) indeksi (mavjud bo'lsa o'tkazib yuboriladi)
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_support_message_ticket_id_created_at ON support_message (ticket_id, created_at)"))
+    db.session.commit()
+
+    now_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{now_time}] Support message index created")
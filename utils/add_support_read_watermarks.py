@@ -0,0 +1,28 @@
+import os
+import sys
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models import db
+from utils.migration import create_migration_app, upgrade_support_ticket
+from utils.support_inbox import recount_ticket_counters
+
+app = create_migration_app()
+
+with app.app_context():
+    # O'qilganlik chegaralari (va counter ustunlari) qo'shiladi, chegaralar
+    # faqat birinchi marta eski is_read maydonidan to'ldiriladi
+    is_backfilled = upgrade_support_ticket()
+    db.session.commit()
+
+    # Counterlarni chegaralar bo'yicha qaytadan hisoblash
+    updated_count = recount_ticket_counters()
+    db.session.commit()
+
+    now_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if is_backfilled:
+        print(f"[{now_time}] Support read watermarks backfilled: {updated_count} tickets")
+    else:
+        print(f"[{now_time}] Support read watermarks already exist, counters recounted: {updated_count} tickets")
@@ -0,0 +1,20 @@
+import os
+import sys
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models import db
+from utils.migration import create_migration_app
+from sqlalchemy import text
+
+app = create_migration_app()
+
+with app.app_context():
+    # user jadvaliga token versiyasini qo'shish (mavjud bo'lsa o'tkazib yuboriladi)
+    db.session.execute(text("ALTER TABLE \"user\" ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0"))
+    db.session.commit()
+
+    now_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{now_time}] user.token_version column added")
@@ -0,0 +1,35 @@
+import os
+import sys
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models import db
+from utils.migration import create_migration_app
+from sqlalchemy import text
+
+app = create_migration_app()
+
+with app.app_context():
+    # lesson.duration_seconds ustunini qo'shish (mavjud bo'lsa o'tkazib yuboriladi)
+    db.session.execute(text(
+        "ALTER TABLE lesson ADD COLUMN IF NOT EXISTS duration_seconds INTEGER"
+    ))
+    db.session.commit()
+
+    # 'MM:SS' satrlardan soniyalarni Postgres ichida hisoblash
+    result = db.session.execute(text(
+        """
+        UPDATE lesson
+        SET duration_seconds = split_part(duration, ':', 1)::int * 60
+                             + split_part(duration, ':', 2)::int
+        WHERE duration ~ '^[0-9]+:[0-9]+$'
+          AND duration_seconds IS DISTINCT FROM
+              split_part(duration, ':', 1)::int * 60 + split_part(duration, ':', 2)::int
+        """
+    ))
+    db.session.commit()
+
+    now_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{now_time}] Lesson durations backfilled: {result.rowcount} rows updated")
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import socketio
+from sockets.support_chat import SUPPORT_ROOM
+
+# Support inbox broadcast narxi: har bir agentning user_<id> room'iga alohida emit
+# yoki bitta SUPPORT_ROOM ga emit. N ta soxta agent (client), paket yuborish stub qilingan,
+# natija - bitta broadcast uchun o'rtacha vaqt (SUPPORT userlar query si hisobga olinmagan).
+# Ishlatish: python utils/bench_inbox_broadcast.py [agent_soni ...]
+REPEAT_COUNT = 2000
+PAYLOAD = {
+    "tickets": [{"id": 1, "student": {"name": "x" * 40}, "last_message": {"message": "y" * 200}}],
+    "unread_count": 7
+}
+
+def create_server(agent_count):
+    server = socketio.Server(async_mode="threading")
+    server._send_eio_packet = lambda *args, **kwargs: None
+    for index in range(agent_count):
+        sid = server.manager.connect(f"eio-{index}", "/")
+        server.manager.enter_room(sid, "/", f"user_{index}")
+        server.manager.enter_room(sid, "/", SUPPORT_ROOM)
+    return server
+
+def mean_us(broadcast):
+    started_at = time.perf_counter()
+    for _ in range(REPEAT_COUNT):
+        broadcast()
+    return (time.perf_counter() - started_at) / REPEAT_COUNT * 1e6
+
+def measure(agent_count):
+    server = create_server(agent_count)
+
+    def per_user_rooms():
+        for index in range(agent_count):
+            server.emit("inbox_delta", PAYLOAD, room=f"user_{index}")
+
+    def support_room():
+        server.emit("inbox_delta", PAYLOAD, room=SUPPORT_ROOM)
+
+    print(f"{agent_count:>3} agents: per-user rooms {mean_us(per_user_rooms):8.1f} us  {SUPPORT_ROOM} {mean_us(support_room):7.1f} us")
+
+if __name__ == "__main__":
+    for agent_count in [int(value) for value in sys.argv[1:]] or [1, 10, 100]:
+        measure(agent_count)
@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from flask import Flask
+from flask_restful.representations.json import output_json as default_output_json
+from models import db
+from models.type import Type
+from models.user import User
+from models.course import Course
+from models.support_ticket import SupportTicket
+from models.support_message import SupportMessage
+from utils.utils import get_response, output_json
+
+# REST javoblarini encode qilish narxi: to_dict, flask-restful standart output_json
+# (DEBUG=True da indent bilan va indentsiz) va orjson li output_json.
+# Postgres o'rniga xotiradagi SQLite, har bir model uchun ROW_COUNT qator, 5 urinishdan eng yaxshisi.
+# Ishlatish: python utils/bench_output_json.py [qatorlar_soni]
+ROW_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+REPEAT_COUNT = 5
+
+app = Flask(__name__)
+app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", SQLALCHEMY_TRACK_MODIFICATIONS=False)
+db.init_app(app)
+
+def best_ms(encode):
+    best = None
+    for _ in range(REPEAT_COUNT):
+        started_at = time.perf_counter()
+        encode()
+        elapsed = time.perf_counter() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def seed():
+    db.create_all()
+    user_type = Type("ALL", "All courses")
+    db.session.add(user_type)
+    db.session.commit()
+
+    now = datetime.now()
+    # Userlar to'g'ridan-to'g'ri insert qilinadi - bcrypt hash bu yerda o'lchanmaydi
+    db.session.execute(User.__table__.insert(), [
+        {
+            "full_name": f"Student {index}", "phone_number": f"+998{index:09d}", "username": f"user{index}",
+            "password": "x" * 60, "role": "STUDENT", "active_term": 9, "type_id": user_type.id,
+            "is_active": True, "token_version": 0, "created_at": now
+        }
+        for index in range(ROW_COUNT)
+    ])
+    db.session.add_all([Course(f"Course {index}", "Kurs haqida ma'lumot " * 10, "https://cdn/x.png", "BEGINNER", user_type.id) for index in range(ROW_COUNT)])
+    db.session.commit()
+
+    ticket = SupportTicket(1, "OPEN")
+    db.session.add(ticket)
+    db.session.commit()
+    db.session.add_all([SupportMessage(ticket.id, 1, "STUDENT", "Salom, dars ochilmayapti " * 3) for _ in range(ROW_COUNT)])
+    db.session.commit()
+
+def measure(name, model):
+    row_list = model.query.all()
+    payload = get_response("ok", [model.to_dict(row) for row in row_list], 200)
+    assert json.loads(output_json(payload, 200).get_data()) == json.loads(default_output_json(payload, 200).get_data())
+
+    to_dict_ms = best_ms(lambda: [model.to_dict(row) for row in row_list])
+    app.debug = True
+    indent_ms = best_ms(lambda: default_output_json(payload, 200))
+    app.debug = False
+    stdlib_ms = best_ms(lambda: default_output_json(payload, 200))
+    orjson_ms = best_ms(lambda: output_json(payload, 200))
+    print(f"{name:15} to_dict {to_dict_ms:6.1f} ms  stdlib+indent {indent_ms:6.1f} ms  stdlib {stdlib_ms:6.1f} ms  orjson {orjson_ms:5.1f} ms")
+
+if __name__ == "__main__":
+    with app.app_context(), app.test_request_context():
+        seed()
+        print(f"{ROW_COUNT} rows")
+        measure("Course", Course)
+        measure("User", User)
+        measure("SupportMessage", SupportMessage)
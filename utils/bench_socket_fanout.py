@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import socketio
+from utils.socket_queue import socketio_queue_options
+
+# local:// bus orqali emit fan-out kechikishi:
+# N ta SocketIO server ("worker"), har birida bitta client user_3 room'ida,
+# server 0 dan emit qilinadi va barcha serverlar paketni olguncha vaqt o'lchanadi.
+# Paket yuborish (engineio) stub qilingan - faqat manager/bus qismi o'lchanadi.
+# Ishlatish: python utils/bench_socket_fanout.py [worker_soni ...]
+EMIT_COUNT = 200
+PAYLOAD = {"tickets": [{"id": 1, "last_message": {"message": "x" * 200}}], "unread_count": 7}
+
+def create_server(channel, index):
+    server = socketio.Server(async_mode="threading", **socketio_queue_options("local://", channel=channel))
+    server.received_at = []
+    server._send_eio_packet = lambda *args, **kwargs: server.received_at.append(time.perf_counter())
+    server.manager.initialize()
+    server.manager_initialized = True
+
+    sid = server.manager.connect(f"eio-{index}", "/")
+    server.manager.enter_room(sid, "/", "user_3")
+    return server
+
+def measure(worker_count):
+    channel = f"bench-{uuid.uuid4().hex}"
+    server_list = [create_server(channel, index) for index in range(worker_count)]
+
+    latency_list = []
+    for index in range(EMIT_COUNT):
+        started_at = time.perf_counter()
+        server_list[0].emit("inbox_delta", PAYLOAD, room="user_3")
+        latency_list.append(max(server.received_at[index] for server in server_list) - started_at)
+
+    latency_list.sort()
+    p50 = latency_list[EMIT_COUNT // 2] * 1000
+    p99 = latency_list[EMIT_COUNT * 99 // 100 - 1] * 1000
+    print(f"{worker_count:>3} workers: p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+if __name__ == "__main__":
+    for worker_count in [int(value) for value in sys.argv[1:]] or [1, 4, 16]:
+        measure(worker_count)
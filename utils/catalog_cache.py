@@ -0,0 +1,388 @@
+import time
+import pickle
+from threading import Lock
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, undefer, load_only
+from models import db
+from models.course import Course
+from models.lesson import Lesson
+from models.course_module import CourseModule
+from models.catalog_version import CatalogVersion
+from models.course_content import CourseContent
+from models.lesson_material import LessonMaterial
+
+CATALOG_CACHE_MAX_SIZE = 500
+CATALOG_CACHE_MAX_BYTES = 64 * 1024 * 1024
+CATALOG_CACHE_TTL = 3600
+CATALOG_CACHE_CHECK_INTERVAL = 2
+CATALOG_GENERATION_KEY = "catalog:generation"
+CATALOG_VERSIONS_GENERATION_KEY = "catalog:versions_generation"
+# Faqat shu resurslar kurs daraxtiga kiradi - boshqalari (news, type, test savollari)
+# o'zgarganda daraxtlar cache dan chiqarilmaydi
+CATALOG_TREE_NAME_LIST = ["course", "course_module", "course_content", "lesson", "lesson_material"]
+# Daraxtdagi darslar uchun faqat qisqa maydonlar - katta Text (description, content)
+# cache ga kirmaydi, ular dars detail endpointidan olinadi
+LESSON_TREE_FIELD_LIST = ["id", "course_module_id", "title", "video_url", "duration", "duration_seconds", "order", "cover_url", "is_active", "created_at"]
+
+def to_catalog_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class LocalCacheBackend:
+    """
+    Process ichidagi LRU (default backend).
+    Har bir worker o'z nusxasiga ega, generation DB dagi catalog_version dan olinadi.
+    Yozuvlar soni (max_size) va taxminiy hajmi (max_bytes, pickle uzunligi) bo'yicha chegaralangan.
+    max_bytes dan katta qiymat cache lanmaydi.
+    """
+    is_shared = False
+
+    def __init__(self, max_size, max_bytes=CATALOG_CACHE_MAX_BYTES):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self.oversized = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, value):
+        # Hajm faqat miss da (yozishda) hisoblanadi
+        value_bytes = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        with self._lock:
+            if value_bytes > self.max_bytes:
+                self.oversized += 1
+                return None
+
+            self._pop(key)
+            self._data[key] = (value_bytes, value)
+            self.bytes += value_bytes
+            while len(self._data) > self.max_size or self.bytes > self.max_bytes:
+                oldest_key = next(iter(self._data))
+                self._pop(oldest_key)
+                self.evictions += 1
+        return None
+
+    def stats(self):
+        with self._lock:
+            _ = {
+                "backend": "local",
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "oversized": self.oversized
+            }
+        return _
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry:
+            self.bytes -= entry[0]
+
+class LocalSharedStore:
+    """
+    Redis o'rnini bosuvchi process ichidagi store (test va lokal ishga tushirish uchun).
+    Barcha nusxalar bitta lug'atni ko'radi - xuddi alohida workerlar bitta Redis ga ulangandek.
+    """
+    _data = {}
+    _data_lock = Lock()
+
+    def get(self, key):
+        with self._data_lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.time():
+                del self._data[key]
+                return None
+        return entry[1]
+
+    def set(self, key, value, ex=None):
+        expire_at = time.time() + ex if ex else None
+        with self._data_lock:
+            self._data[key] = (expire_at, value)
+        return True
+
+    def incr(self, key):
+        with self._data_lock:
+            entry = self._data.get(key)
+            value = int(entry[1]) + 1 if entry else 1
+            self._data[key] = (None, str(value).encode("utf-8"))
+        return value
+
+class SharedCacheBackend:
+    """
+    Workerlar uchun umumiy store (Redis yoki LocalSharedStore).
+    Qiymatlar pickle qilinadi, eski generation kalitlari TTL bilan o'chadi.
+    Xotira chegarasi store tomonda: Redis da maxmemory + allkeys-lru.
+    """
+    is_shared = True
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key):
+        raw = self.client.get(key)
+        if raw is None:
+            return None
+        return pickle.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(key, pickle.dumps(value), ex=self.ttl)
+        return None
+
+    def get_counter(self, key):
+        raw = self.client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+    def stats(self):
+        _ = {
+            "backend": "shared",
+            "ttl": self.ttl
+        }
+        return _
+
+def catalog_cache_backend(cache_url, max_size=CATALOG_CACHE_MAX_SIZE, max_bytes=CATALOG_CACHE_MAX_BYTES, ttl=CATALOG_CACHE_TTL):
+    """
+    CATALOG_CACHE_URL bo'yicha backend:
+    - None / ""      -> process ichidagi LRU
+    - "local://"     -> process ichidagi umumiy store (test uchun)
+    - "redis://..."  -> Redis (rediss:// ham)
+    """
+    if not cache_url:
+        return LocalCacheBackend(max_size, max_bytes)
+
+    if cache_url.startswith("local://"):
+        return SharedCacheBackend(LocalSharedStore(), ttl)
+
+    import redis
+    return SharedCacheBackend(redis.Redis.from_url(cache_url), ttl)
+
+def load_catalog_versions():
+    """{resurs_nomi: version} - conditional GET ETag lari uchun"""
+    return dict(db.session.query(CatalogVersion.name, CatalogVersion.version).all())
+
+def load_course_tree(course_id):
+    """
+    Kurs daraxti: kurs, modullar, kontentlar, darslar va materiallar (5 ta query).
+    Darslardan faqat LESSON_TREE_FIELD_LIST ustunlari SELECT qilinadi.
+    Kurs topilmasa {"course": None} - yo'q kurslar ham cache lanadi.
+    """
+    course = Course.query.options(undefer("*")).filter_by(id=course_id).first()
+    if not course:
+        return {"course": None}
+
+    course_module_list = CourseModule.query.filter_by(course_id=course.id).order_by(CourseModule.order.asc()).all()
+    course_content_list = CourseContent.query.filter_by(course_id=course.id).order_by(CourseContent.created_at.desc()).all()
+
+    lesson_list = []
+    course_module_id_list = [course_module.id for course_module in course_module_list]
+    if course_module_id_list:
+        lesson_list = (
+            Lesson.query
+            .options(load_only(*[getattr(Lesson, field) for field in LESSON_TREE_FIELD_LIST]))
+            .filter(Lesson.course_module_id.in_(course_module_id_list))
+            .order_by(Lesson.order.asc())
+            .all()
+        )
+
+    lesson_material_list = []
+    lesson_id_list = [lesson.id for lesson in lesson_list]
+    if lesson_id_list:
+        lesson_material_list = LessonMaterial.query.filter(LessonMaterial.lesson_id.in_(lesson_id_list)).order_by(LessonMaterial.created_at.desc()).all()
+
+    lesson_map = {course_module_id: [] for course_module_id in course_module_id_list}
+    for lesson in lesson_list:
+        lesson_map[lesson.course_module_id].append(Lesson.to_dict(lesson, LESSON_TREE_FIELD_LIST))
+
+    lesson_material_map = {lesson_id: [] for lesson_id in lesson_id_list}
+    for lesson_material in lesson_material_list:
+        lesson_material_map[lesson_material.lesson_id].append(LessonMaterial.to_dict(lesson_material))
+
+    _ = {
+        "course": Course.to_dict(course),
+        "modules": [CourseModule.to_dict(course_module) for course_module in course_module_list],
+        "contents": [CourseContent.to_dict(course_content) for course_content in course_content_list],
+        "lessons": lesson_map,
+        "materials": lesson_material_map
+    }
+    return _
+
+def load_lesson_course_map():
+    """{lesson_id: course_id} - dars materiallarini kurs daraxtidan topish uchun"""
+    return dict(
+        db.session.query(Lesson.id, CourseModule.course_id)
+        .join(CourseModule, CourseModule.id == Lesson.course_module_id)
+        .all()
+    )
+
+class CatalogCache:
+    """
+    Katalog (kurs daraxti, resurs versiyalari) uchun versiyali cache.
+    Kalitlar generation bilan yoziladi: daraxt resursi (CATALOG_TREE_NAME_LIST) commit
+    bo'lgach generation oshadi va eski yozuvlar shunchaki o'qilmay qoladi (LRU / TTL bilan o'chadi).
+    Resurs versiyalari (ETag, javob kalitlari) daraxtdan alohida yangilanadi.
+    - local backend: catalog_version qatorlari check_interval da bir marta o'qiladi
+      (boshqa workerlar o'zgarishi uchun), generation = daraxt resurslari versiyalari yig'indisi
+    - shared backend: generation va versiyalar generationi store dagi counterlar,
+      DB ga umuman murojaat yo'q
+    Cache dan o'qiladi: kurs detail, modul / kontent / material ro'yxatlari.
+    Kurs ro'yxati (pagination, fields), dars ro'yxati va dars detail (description,
+    content) hozircha to'g'ridan-to'g'ri DB dan o'qiladi.
+    """
+
+    def __init__(self, backend, check_interval):
+        self.backend = backend
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation_checks = 0
+        self._generation = 0
+        self._versions = {}
+        self._checked_at = 0
+        self._lock = Lock()
+
+    def set_backend(self, backend):
+        with self._lock:
+            self.backend = backend
+            self._checked_at = 0
+        return None
+
+    def check_local_versions(self):
+        """Local backend: catalog_version qatorlari (check_interval da bitta query)"""
+        now = time.time()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._versions
+
+        version_map = load_catalog_versions()
+        generation = sum(version_map.get(name, 0) for name in CATALOG_TREE_NAME_LIST)
+        with self._lock:
+            self._versions = version_map
+            self._generation = max(self._generation, generation)
+            self._checked_at = now
+            self.generation_checks += 1
+            return self._versions
+
+    def generation(self):
+        backend = self.backend
+        if backend.is_shared:
+            return backend.get_counter(CATALOG_GENERATION_KEY)
+
+        self.check_local_versions()
+        with self._lock:
+            return self._generation
+
+    def invalidate(self, name_set):
+        """Admin yozuvi commit bo'lgandan KEYIN chaqiriladi (o'zgargan resurslar nomlari bilan)"""
+        is_tree_changed = any(name in CATALOG_TREE_NAME_LIST for name in name_set)
+
+        backend = self.backend
+        if backend.is_shared:
+            backend.incr(CATALOG_VERSIONS_GENERATION_KEY)
+            if is_tree_changed:
+                backend.incr(CATALOG_GENERATION_KEY)
+
+        with self._lock:
+            # Local: keyingi o'qishda versiyalar DB dan qayta olinadi
+            self._checked_at = 0
+            if is_tree_changed:
+                self.invalidations += 1
+        return None
+
+    def get_or_load(self, name, loader, *args):
+        return self.load_key(f"catalog:{self.generation()}:{name}", loader, *args)
+
+    def load_key(self, key, loader, *args):
+        backend = self.backend
+        value = backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+
+        # O'qish davomida commit bo'lsa, eski generation kalitiga yoziladi - yangi o'qishlar uni ko'rmaydi
+        value = loader(*args)
+        backend.set(key, value)
+        return value
+
+    def get_versions(self):
+        """{resurs_nomi: version} - daraxt generationiga bog'liq emas"""
+        backend = self.backend
+        if not backend.is_shared:
+            return self.check_local_versions()
+
+        versions_generation = backend.get_counter(CATALOG_VERSIONS_GENERATION_KEY)
+        return self.load_key(f"catalog:versions:{versions_generation}", load_catalog_versions)
+
+    def get_course_tree(self, course_id):
+        """Kurs daraxti yoki None (kurs topilmasa)"""
+        course_id = to_catalog_id(course_id)
+        if course_id is None:
+            return None
+
+        tree = self.get_or_load(f"course:{course_id}", load_course_tree, course_id)
+        if tree["course"] is None:
+            return None
+        return tree
+
+    def get_lesson_course_id(self, lesson_id):
+        lesson_id = to_catalog_id(lesson_id)
+        if lesson_id is None:
+            return None
+        return self.get_or_load("lesson_course_map", load_lesson_course_map).get(lesson_id)
+
+    def stats(self):
+        backend_stats = self.backend.stats()
+        with self._lock:
+            lookup_count = self.hits + self.misses
+            _ = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookup_count, 4) if lookup_count else 0,
+                "invalidations": self.invalidations,
+                "generation_checks": self.generation_checks,
+                **backend_stats
+            }
+        return _
+
+catalog_cache = CatalogCache(LocalCacheBackend(CATALOG_CACHE_MAX_SIZE), CATALOG_CACHE_CHECK_INTERVAL)
+
+def mark_catalog_changed(name_list):
+    """bump_catalog_version dan chaqiriladi: joriy tranzaksiya shu resurslarni o'zgartirdi"""
+    db.session.info.setdefault("catalog_changed", set()).update(name_list)
+    return None
+
+@event.listens_for(Session, "after_commit")
+def invalidate_catalog_after_commit(session):
+    # Generation faqat commitdan keyin oshadi - aks holda parallel o'qish
+    # eski ma'lumotni yangi generation ostida cache lab qo'yishi mumkin
+    name_set = session.info.pop("catalog_changed", None)
+    if name_set:
+        catalog_cache.invalidate(name_set)
+
+@event.listens_for(Session, "after_rollback")
+def clear_catalog_changed(session):
+    session.info.pop("catalog_changed", None)
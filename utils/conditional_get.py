@@ -0,0 +1,103 @@
+import hashlib
+from functools import wraps
+from threading import Lock
+from datetime import datetime
+from flask import request, make_response
+from werkzeug.http import quote_etag
+from models import db
+from models.catalog_version import CatalogVersion, time_zone
+from utils.catalog_cache import catalog_cache, mark_catalog_changed
+
+CATALOG_NAME_LIST = ["course", "course_module", "course_content", "lesson", "lesson_material", "type", "language", "news", "lesson_test", "module_test"]
+
+def ensure_catalog_versions():
+    """Barcha katalog resurslari uchun version qatorlarini yaratadi (app ishga tushganda)"""
+    existing_name_set = {name for (name,) in db.session.query(CatalogVersion.name).all()}
+    for name in CATALOG_NAME_LIST:
+        if name not in existing_name_set:
+            db.session.add(CatalogVersion(name))
+    db.session.commit()
+    return None
+
+def bump_catalog_version(*name_list):
+    """
+    Resurs o'zgarganda versiyani oshiradi.
+    Commitdan oldin chaqiriladi - o'zgarish bilan bitta tranzaksiyada.
+    Katalog cache commitdan keyin invalidate qilinadi.
+    """
+    mark_catalog_changed(name_list)
+    for name in name_list:
+        updated_count = CatalogVersion.query.filter_by(name=name).update(
+            {
+                CatalogVersion.version: CatalogVersion.version + 1,
+                CatalogVersion.updated_at: datetime.now(time_zone)
+            },
+            synchronize_session=False
+        )
+        if not updated_count:
+            catalog_version = CatalogVersion(name)
+            catalog_version.version = 1
+            db.session.add(catalog_version)
+    return None
+
+def catalog_etag(name_list):
+    """Resurs versiyalari (katalog cache dan) + so'rov yo'li va parametrlaridan strong ETag"""
+    version_map = catalog_cache.get_versions()
+    raw = "|".join(f"{name}:{version_map.get(name, 0)}" for name in name_list)
+    raw = f"{raw}|{request.full_path}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32]
+
+class ConditionalGetStats:
+    """Conditional GET statistikasi (/metrics uchun)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = Lock()
+
+    def record(self, is_not_modified):
+        with self._lock:
+            self.requests += 1
+            if is_not_modified:
+                self.not_modified += 1
+        return None
+
+    def stats(self):
+        with self._lock:
+            _ = {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "not_modified_rate": round(self.not_modified / self.requests, 4) if self.requests else 0
+            }
+        return _
+
+conditional_get_stats = ConditionalGetStats()
+
+def conditional_get(*name_list):
+    """
+    Katalog GET lari uchun ETag / If-None-Match.
+    ETag resurs versiyalaridan olinadi, mos kelsa 304 qatorlarni
+    yuklash va serialize qilishdan OLDIN qaytariladi.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            etag = catalog_etag(name_list)
+            headers = {
+                "ETag": quote_etag(etag),
+                "Cache-Control": "private, no-cache"
+            }
+
+            if request.if_none_match.contains(etag):
+                conditional_get_stats.record(True)
+                response = make_response("", 304)
+                response.headers.extend(headers)
+                return response
+
+            conditional_get_stats.record(False)
+            result = func(*args, **kwargs)
+            if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                return result[0], result[1], headers
+            return result
+        return wrapper
+    return decorator
@@ -1,7 +1,8 @@
+from flask import g
 from functools import wraps
-from models.user import User
 from utils.utils import get_response
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.identity import resolve_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 def role_required(role_list):
     def decorator(func):
@@ -10,13 +11,14 @@ def role_required(role_list):
         def wrapper(*args, **kwargs):
             username = get_jwt_identity()
 
-            user = User.query.filter_by(username=username).first()
-            if not user:
+            identity = resolve_identity(username, get_jwt())
+            if not identity:
                 return get_response("User not found", None, 404), 404
             
-            if user.role not in role_list:
+            if identity["role"] not in role_list:
                 return get_response("Permission denied", None, 403), 403
             
+            g.current_identity = identity
             return func(*args, **kwargs)
         return wrapper
     return decorator
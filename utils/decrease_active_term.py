@@ -22,7 +22,8 @@ with app.app_context():
         User.active_term <= 0,
         User.is_active == True
     ).update(
-        {User.is_active: False},
+        # token_version oshiriladi - bu userlarning eski tokenlari claimlari bilan qabul qilinmaydi
+        {User.is_active: False, User.token_version: User.token_version + 1},
         synchronize_session=False
     )
     db.session.commit()
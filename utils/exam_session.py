@@ -0,0 +1,68 @@
+import time
+import secrets
+from threading import Lock
+from models import db
+from models.exam_session import ExamSession
+
+EXAM_SESSION_TTL = 3600
+
+class ExamSessionStore:
+    """
+    Exam sessiyalar ombori (exam_session jadvali, TTL bilan).
+    Sessiya DB da saqlanadi - finish so'rovi boshqa workerga tushsa yoki
+    server qayta ishga tushsa ham topiladi.
+    Sessiya bir marta ishlatiladi: natija bilan bitta tranzaksiyada o'chiriladi.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.created = 0
+        self.finished = 0
+        self.rejected = 0
+        self._lock = Lock()
+
+    def create(self, student_id, kind, parent_id, answer_key):
+        session_id = secrets.token_urlsafe(16)
+        now = time.time()
+
+        # Muddati o'tgan sessiyalarni tozalash (expires_at indeksi bo'yicha)
+        ExamSession.query.filter(ExamSession.expires_at <= now).delete(synchronize_session=False)
+        db.session.add(ExamSession(session_id, student_id, kind, parent_id, answer_key, now + self.ttl))
+        db.session.commit()
+
+        with self._lock:
+            self.created += 1
+        return session_id
+
+    def get(self, session_id, student_id, kind):
+        """Sessiyani qaytaradi (topilmasa, boshqa studentniki yoki muddati o'tgan bo'lsa None)"""
+        session = ExamSession.query.filter_by(id=session_id, student_id=student_id, kind=kind).first()
+        if not session or session.expires_at <= time.time():
+            with self._lock:
+                self.rejected += 1
+            return None
+        return session
+
+    def consume(self, session_id):
+        """
+        Sessiyani o'chiradi. Commit chaqiruvchi tomonidan (natija bilan bitta tranzaksiyada).
+        Parallel so'rov uni oldinroq ishlatgan bo'lsa False.
+        """
+        deleted_count = ExamSession.query.filter_by(id=session_id).delete(synchronize_session=False)
+        with self._lock:
+            if deleted_count:
+                self.finished += 1
+            else:
+                self.rejected += 1
+        return deleted_count == 1
+
+    def stats(self):
+        with self._lock:
+            _ = {
+                "created": self.created,
+                "finished": self.finished,
+                "rejected": self.rejected
+            }
+        return _
+
+exam_session_store = ExamSessionStore(EXAM_SESSION_TTL)
@@ -0,0 +1,99 @@
+import time
+from queue import Queue, Full
+from threading import Lock
+
+FANOUT_WORKER_COUNT = 4
+FANOUT_MAX_QUEUE_SIZE = 10000
+
+class FanoutPool:
+    """
+    Commitdan keyingi og'ir ishlar (ticket listlar, inbox delta) uchun fon workerlari.
+    Handler commitdan so'ng darhol javob qaytaradi, qolgan ish navbatga qo'yiladi.
+    Bir xil kalit (ticket) ishlari doim bitta workerda ketma-ket bajariladi,
+    shuning uchun eski snapshot yangisidan keyin yuborilmaydi.
+    Navbat to'lsa ish handlerning o'zida bajariladi (update yo'qolmaydi).
+    Pool process uchun bitta, har bir ish o'z app i bilan yuboriladi va shu app
+    contextida bajariladi (bir processdagi bir nechta app bir-biriga aralashmaydi).
+    """
+
+    def __init__(self, worker_count, max_queue_size):
+        self.worker_count = worker_count
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.inline = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.run_time_total = 0.0
+        self.run_time_max = 0.0
+        self._queue_list = [Queue(max_queue_size) for _ in range(worker_count)]
+        self._started = False
+        self._lock = Lock()
+
+    def start(self, start_background_task):
+        """Workerlarni bir marta ishga tushiradi (socketio.start_background_task orqali)"""
+        with self._lock:
+            if self._started:
+                return None
+            self._started = True
+
+        for worker_queue in self._queue_list:
+            start_background_task(self._worker, worker_queue)
+        return None
+
+    def submit(self, key, app, func, *args):
+        """func(*args) ni app contextida bajarish uchun navbatga qo'yadi"""
+        worker_queue = self._queue_list[hash(key) % self.worker_count]
+        try:
+            worker_queue.put_nowait((time.time(), app, func, args))
+        except Full:
+            with self._lock:
+                self.inline += 1
+            func(*args)
+            return False
+
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def stats(self):
+        with self._lock:
+            finished_count = self.completed + self.failed
+            _ = {
+                "queue_depth": sum(worker_queue.qsize() for worker_queue in self._queue_list),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "inline": self.inline,
+                "wait_ms_avg": round(self.wait_time_total / finished_count * 1000, 3) if finished_count else 0,
+                "wait_ms_max": round(self.wait_time_max * 1000, 3),
+                "run_ms_avg": round(self.run_time_total / finished_count * 1000, 3) if finished_count else 0,
+                "run_ms_max": round(self.run_time_max * 1000, 3)
+            }
+        return _
+
+    def _worker(self, worker_queue):
+        while True:
+            submitted_at, app, func, args = worker_queue.get()
+            started_at = time.time()
+            is_failed = False
+
+            with app.app_context():
+                try:
+                    func(*args)
+                except Exception as e:
+                    is_failed = True
+                    print("❌ FANOUT ERROR:", str(e))
+
+            finished_at = time.time()
+            with self._lock:
+                if is_failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self.wait_time_total += started_at - submitted_at
+                self.wait_time_max = max(self.wait_time_max, started_at - submitted_at)
+                self.run_time_total += finished_at - started_at
+                self.run_time_max = max(self.run_time_max, finished_at - started_at)
+
+fanout_pool = FanoutPool(FANOUT_WORKER_COUNT, FANOUT_MAX_QUEUE_SIZE)
@@ -0,0 +1,167 @@
+import time
+import random
+from threading import Lock
+from models import db
+from collections import OrderedDict
+from utils.catalog_cache import catalog_cache
+
+ANSWER_KEY_CACHE_MAX_SIZE = 2000
+ANSWER_KEY_CACHE_MAX_QUESTIONS = 200000
+ANSWER_KEY_CACHE_TTL = 600
+
+def to_question_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def load_answer_key(model, parent_column, parent_id):
+    """
+    Modul yoki dars savollarining to'g'ri javoblarini bitta query bilan oladi.
+    Natija: {savol_id: correct_option}
+    """
+    rows = db.session.query(model.id, model.correct_option).filter(parent_column == parent_id).all()
+    return {question_id: correct_option for question_id, correct_option in rows}
+
+class AnswerKeyCache:
+    """
+    Process ichidagi LRU cache: (jadval, modul/dars ID) -> {savol_id: correct_option}.
+    Savollar yaratilganda, o'zgartirilganda yoki o'chirilganda invalidate qilinadi.
+    Har bir yozuv jadvalning catalog_version versiyasi bilan saqlanadi - boshqa workerda
+    savol o'zgarsa (bump_catalog_version) versiya mos kelmaydi va javoblar qayta o'qiladi.
+    Versiyalar catalog_cache orqali o'qiladi (har so'rovda DB ga murojaat yo'q).
+    """
+
+    def __init__(self, max_size, max_questions, ttl):
+        self.max_size = max_size
+        self.max_questions = max_questions
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.question_count = 0
+        self._generation = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, model, parent_column, parent_id):
+        parent_id = to_question_id(parent_id)
+        if parent_id is None:
+            return {}
+
+        key = (model.__tablename__, parent_id)
+        now = time.time()
+        # Versiya javoblar o'qilishidan OLDIN olinadi - oradagi o'zgarish keyingi so'rovda ko'rinadi
+        version = catalog_cache.get_versions().get(model.__tablename__, 0)
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > now and entry[1] == version:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            generation = self._generation
+
+        answer_key = load_answer_key(model, parent_column, parent_id)
+
+        with self._lock:
+            # O'qish davomida invalidate bo'lgan bo'lsa, eskirgan natija saqlanmaydi
+            if generation != self._generation:
+                return answer_key
+
+            self._pop(key)
+            self._data[key] = (now + self.ttl, version, answer_key)
+            self.question_count += len(answer_key)
+            while len(self._data) > self.max_size or self.question_count > self.max_questions:
+                oldest_key = next(iter(self._data))
+                self._pop(oldest_key)
+                self.evictions += 1
+        return answer_key
+
+    def invalidate(self, model, parent_id):
+        parent_id = to_question_id(parent_id)
+        if parent_id is None:
+            return None
+
+        with self._lock:
+            self._generation += 1
+            self._pop((model.__tablename__, parent_id))
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self.question_count = 0
+        return None
+
+    def stats(self):
+        with self._lock:
+            _ = {
+                "size": len(self._data),
+                "question_count": self.question_count,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+        return _
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+        if entry:
+            self.question_count -= len(entry[2])
+
+answer_key_cache = AnswerKeyCache(ANSWER_KEY_CACHE_MAX_SIZE, ANSWER_KEY_CACHE_MAX_QUESTIONS, ANSWER_KEY_CACHE_TTL)
+
+def sample_questions(model, parent_column, parent_id, count, seed=None):
+    """
+    Savollar bankidan tasodifiy `count` ta savol tanlaydi.
+    Faqat ID lar (answer key cache orqali) olinadi, keyin tanlangan qatorlar
+    bitta IN query bilan yuklanadi. `seed` berilsa natija takrorlanuvchan.
+    """
+    question_id_list = sorted(answer_key_cache.get(model, parent_column, parent_id))
+    count = min(count, len(question_id_list))
+    if count <= 0:
+        return []
+
+    rng = random.Random(seed) if seed is not None else random
+    sampled_id_list = rng.sample(question_id_list, count)
+
+    question_map = {
+        question.id: question
+        for question in model.query.filter(model.id.in_(sampled_id_list)).all()
+    }
+    return [question_map[question_id] for question_id in sampled_id_list if question_id in question_map]
+
+def grade_answers(answer_list, id_key, answer_key):
+    """
+    Javoblarni xotirada tekshiradi (DB ga murojaatsiz).
+    (correct_count, har bir savol bo'yicha natijalar) qaytaradi.
+    """
+    correct_count = 0
+    graded_list = []
+    graded_id_set = set()
+    for answer in answer_list:
+        if not isinstance(answer, dict):
+            continue
+
+        question_id = to_question_id(answer.get(id_key))
+        result = answer.get('result')
+
+        # Bitta savolga faqat birinchi javob hisoblanadi
+        if not question_id or not result or not isinstance(result, str) or question_id in graded_id_set:
+            continue
+        graded_id_set.add(question_id)
+        result = result.upper()
+
+        is_correct = answer_key.get(question_id) == result
+        if is_correct:
+            correct_count += 1
+
+        graded_list.append({
+            id_key: question_id,
+            "result": result,
+            "is_correct": is_correct
+        })
+    return correct_count, graded_list
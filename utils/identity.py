@@ -0,0 +1,71 @@
+import time
+from threading import Lock
+
+IDENTITY_CACHE_TTL = 60
+IDENTITY_CACHE_MAX_SIZE = 10000
+IDENTITY_KEY_LIST = ("user_id", "role", "type_id", "is_active", "token_version")
+
+_lock = Lock()
+_identity_cache = {}
+
+def identity_claims(user):
+    """JWT ichiga yoziladigan qo'shimcha claimlar"""
+    _ = {
+        "user_id": user.id,
+        "role": user.role,
+        "type_id": user.type_id,
+        "is_active": user.is_active,
+        "token_version": user.token_version or 0
+    }
+    return _
+
+def load_identity(username):
+    """
+    Userni DB dan o'qiydi (faqat identity ustunlari) va natijani
+    IDENTITY_CACHE_TTL soniya davomida process ichida saqlaydi
+    """
+    from models import db
+    from models.user import User
+
+    now = time.time()
+    with _lock:
+        cached = _identity_cache.get(username)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    user = db.session.query(
+        User.id, User.role, User.type_id, User.is_active, User.token_version
+    ).filter(User.username == username).first()
+    identity = identity_claims(user) if user else None
+
+    with _lock:
+        if len(_identity_cache) >= IDENTITY_CACHE_MAX_SIZE:
+            _identity_cache.clear()
+        _identity_cache[username] = (now + IDENTITY_CACHE_TTL, identity)
+    return identity
+
+def resolve_identity(username, claims):
+    """
+    Token claimlari bo'yicha identity qaytaradi.
+    Claimlar faqat tokendagi token_version userning joriy versiyasiga teng bo'lsa ishlatiladi.
+    Joriy versiya DB da saqlanadi (admin o'zgartirishi va cron uni oshiradi) va
+    IDENTITY_CACHE_TTL cache orqali o'qiladi - barcha workerlar o'zgarishni
+    ko'pi bilan IDENTITY_CACHE_TTL soniyada ko'radi.
+    Eski tokenlar (claimsiz) yoki eskirgan versiyali tokenlar uchun DB qiymati qaytariladi.
+    """
+    identity = load_identity(username)
+    if identity is None:
+        return None
+
+    if "role" in claims and claims.get("token_version", 0) == identity["token_version"]:
+        return {key: claims.get(key, identity[key]) for key in IDENTITY_KEY_LIST}
+    return identity
+
+def invalidate_identity(username):
+    """
+    User o'zgargandan keyin (commitdan so'ng) joriy processdagi cache ni tozalaydi.
+    Boshqa workerlar uchun token_version ustuni oshirilgan bo'lishi kerak.
+    """
+    with _lock:
+        _identity_cache.pop(username, None)
+    return None
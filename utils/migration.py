@@ -0,0 +1,64 @@
+from flask import Flask
+from sqlalchemy import text, inspect
+from models import db, DATABASE_URI
+
+def create_migration_app():
+    """
+    Migratsiya / backfill skriptlari uchun faqat DB ulangan Flask app.
+    app.py import qilinmaydi: u ishga tushishda super_admin_create() orqali
+    user jadvalini joriy model ustunlari bilan SELECT qiladi va yangi ustun
+    hali qo'shilmagan DB da yiqiladi.
+    """
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=DATABASE_URI,
+        SQLALCHEMY_TRACK_MODIFICATIONS=False
+    )
+    db.init_app(app)
+    return app
+
+SUPPORT_TICKET_COLUMN_LIST = [
+    # Inbox counterlari va oxirgi xabar ko'rsatkichi
+    "unread_for_support INTEGER NOT NULL DEFAULT 0",
+    "unread_for_student INTEGER NOT NULL DEFAULT 0",
+    "last_message_id INTEGER",
+    "last_message_at TIMESTAMP",
+    # O'qilganlik chegaralari (shu ID gacha bo'lgan xabarlar o'qilgan)
+    "support_read_up_to INTEGER NOT NULL DEFAULT 0",
+    "student_read_up_to INTEGER NOT NULL DEFAULT 0"
+]
+
+def upgrade_support_ticket():
+    """
+    support_ticket jadvaliga recount_ticket_counters() ishlatadigan barcha ustunlarni
+    qo'shadi (mavjudlari o'tkazib yuboriladi). Commit chaqiruvchi tomonidan.
+    O'qilganlik chegaralari faqat ular endi yaratilganda eski is_read maydonidan
+    to'ldiriladi - keyingi ishga tushirishlar joriy chegaralarni buzmaydi.
+    Chegaralar to'ldirilgan bo'lsa True qaytaradi.
+    """
+    column_name_list = [column["name"] for column in inspect(db.engine).get_columns("support_ticket")]
+
+    for column in SUPPORT_TICKET_COLUMN_LIST:
+        db.session.execute(text(f"ALTER TABLE support_ticket ADD COLUMN IF NOT EXISTS {column}"))
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_support_ticket_last_message_at ON support_ticket (last_message_at)"))
+
+    if "support_read_up_to" in column_name_list:
+        return False
+
+    # Chegaralarni eski is_read maydonidan to'ldirish (o'qilgan eng oxirgi xabar ID si)
+    db.session.execute(text("""
+        UPDATE support_ticket SET
+            support_read_up_to = COALESCE((
+                SELECT MAX(support_message.id) FROM support_message
+                WHERE support_message.ticket_id = support_ticket.id
+                  AND support_message.sender_role = 'STUDENT'
+                  AND support_message.is_read
+            ), 0),
+            student_read_up_to = COALESCE((
+                SELECT MAX(support_message.id) FROM support_message
+                WHERE support_message.ticket_id = support_ticket.id
+                  AND support_message.sender_role != 'STUDENT'
+                  AND support_message.is_read
+            ), 0)
+    """))
+    return True
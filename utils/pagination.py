@@ -0,0 +1,57 @@
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+from flask_restful import reqparse
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+pagination_parse = reqparse.RequestParser()
+pagination_parse.add_argument("limit", type=int, location="args")
+pagination_parse.add_argument("after", type=str, location="args")
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(created_at, id):
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeError):
+        raise InvalidCursor("Invalid cursor")
+
+def paginate(query, model, limit=None, after=None):
+    """
+    (created_at, id) bo'yicha keyset pagination.
+    Natija yangidan eskiga qarab tartiblanadi, next_cursor
+    keyingi sahifa bo'lmasa None qaytadi.
+    limit berilmasa (eski clientlar) DEFAULT_PAGE_SIZE ishlatiladi -
+    javob hajmi jadval o'sishi bilan o'smaydi.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    if limit is None or limit <= 0:
+        limit = DEFAULT_PAGE_SIZE
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    if after:
+        created_at, id = decode_cursor(after)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+
+    item_list = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(item_list) > limit:
+        item_list = item_list[:limit]
+        last_item = item_list[-1]
+        next_cursor = encode_cursor(last_item.created_at, last_item.id)
+    return item_list, next_cursor
+
+def paginate_request(query, model):
+    """So'rovdagi ?limit= va ?after= parametrlarini o'qib paginate qiladi"""
+    data = pagination_parse.parse_args()
+    return paginate(query, model, data.get("limit", None), data.get("after", None))
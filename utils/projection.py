@@ -0,0 +1,56 @@
+from sqlalchemy import DateTime
+from sqlalchemy.orm import load_only, undefer
+from flask_restful import reqparse
+
+fields_parse = reqparse.RequestParser()
+fields_parse.add_argument("fields", type=str, location="args")
+
+class InvalidFields(ValueError):
+    pass
+
+def parse_fields(model, fields):
+    """
+    'id,title,order' -> ['id', 'title', 'order'].
+    Berilmasa None (barcha maydonlar), noma'lum maydon bo'lsa InvalidFields.
+    """
+    if not fields:
+        return None
+
+    field_list = []
+    for field in fields.split(","):
+        field = field.strip()
+        if not field or field in field_list:
+            continue
+        if field not in model.__table__.columns:
+            raise InvalidFields(f"Unknown field: {field}")
+        field_list.append(field)
+    return field_list or None
+
+def fields_request(model):
+    """So'rovdagi ?fields= parametrini o'qiydi"""
+    data = fields_parse.parse_args()
+    return parse_fields(model, data.get("fields", None))
+
+def load_fields(query, model, field_list, required_list=()):
+    """
+    Faqat kerakli ustunlarni SELECT qiladi (load_only).
+    required_list - javobda bo'lmasa ham route logikasi uchun kerak ustunlar (id, order, created_at ...)
+    fields berilmasa to'liq to_dict uchun deferred ustunlar ham yuklanadi.
+    """
+    if field_list is None:
+        return query.options(undefer("*"))
+
+    column_name_list = dict.fromkeys(list(required_list) + field_list)
+    return query.options(load_only(*[getattr(model, column_name) for column_name in column_name_list]))
+
+def fields_to_dict(model_object, field_list):
+    """to_dict ning qisqa varianti: faqat so'ralgan (yuklangan) maydonlar"""
+    table_columns = model_object.__table__.columns
+
+    _ = {}
+    for field in field_list:
+        value = getattr(model_object, field)
+        if isinstance(table_columns[field].type, DateTime):
+            value = str(value)
+        _[field] = value
+    return _
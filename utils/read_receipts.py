@@ -0,0 +1,48 @@
+from threading import Lock
+
+READ_RECEIPT_WINDOW = 0.5
+
+class ReadReceiptBatcher:
+    """
+    mark_as_read eventlarini qisqa oyna (window) davomida yig'adi.
+    Oyna oxirida har bir tomon (STUDENT / SUPPORT) uchun barcha ticketlar
+    bitta UPDATE va bitta delta emit bilan yoziladi.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.received = 0
+        self.flushes = 0
+        self.ticket_updates = 0
+        self._pending = {}
+        self._lock = Lock()
+
+    def add(self, reader_role, reader_id, ticket_id, read_up_to):
+        """Bitta o'qilganlik eventini navbatga qo'shadi (eng katta chegara saqlanadi)"""
+        with self._lock:
+            read_up_to_map = self._pending.setdefault((reader_role, reader_id), {})
+            if read_up_to > read_up_to_map.get(ticket_id, 0):
+                read_up_to_map[ticket_id] = read_up_to
+            self.received += 1
+        return None
+
+    def drain(self):
+        """Yig'ilgan eventlarni qaytaradi va navbatni tozalaydi: {(role, user_id): {ticket_id: read_up_to}}"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if pending:
+                self.flushes += 1
+                self.ticket_updates += sum(len(read_up_to_map) for read_up_to_map in pending.values())
+        return pending
+
+    def stats(self):
+        with self._lock:
+            _ = {
+                "pending": len(self._pending),
+                "received": self.received,
+                "flushes": self.flushes,
+                "ticket_updates": self.ticket_updates
+            }
+        return _
+
+read_receipt_batcher = ReadReceiptBatcher(READ_RECEIPT_WINDOW)
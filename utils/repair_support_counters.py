@@ -0,0 +1,24 @@
+import os
+import sys
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models import db
+from utils.migration import create_migration_app, upgrade_support_ticket
+from utils.support_inbox import recount_ticket_counters
+
+app = create_migration_app()
+
+with app.app_context():
+    # support_ticket jadvaliga counter va o'qilganlik chegarasi ustunlarini qo'shish (mavjud bo'lsa o'tkazib yuboriladi)
+    upgrade_support_ticket()
+    db.session.commit()
+
+    # Counterlar va oxirgi xabarni support_message dan qaytadan hisoblash
+    updated_count = recount_ticket_counters()
+    db.session.commit()
+
+    now_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{now_time}] Support ticket counters repaired: {updated_count} tickets")
@@ -0,0 +1,61 @@
+import pickle
+import socketio
+from threading import Lock
+
+SOCKETIO_CHANNEL = "my-zone-socketio"
+
+class LocalBusManager(socketio.Manager):
+    """
+    Process ichidagi message queue (Redis o'rnini bosuvchi, test va lokal ishga tushirish uchun).
+    Bitta process ichidagi bir nechta SocketIO serverlari xuddi alohida
+    workerlar kabi bitta kanal orqali emit almashadi.
+    Xabarlar Redis dagi kabi pickle qilinadi (har bir server o'z nusxasini oladi).
+    PubSubManager emas - shuning uchun flask_socketio test client bilan ishlaydi
+    (har bir "worker" server uchun alohida test client ochiladi).
+    Emit chaqiruvchi threadda barcha serverlarga yetkaziladi, callback faqat lokal clientlarga.
+    """
+    name = "local"
+
+    _bus = {}
+    _bus_lock = Lock()
+
+    def __init__(self, channel=SOCKETIO_CHANNEL):
+        super().__init__()
+        self.channel = channel
+        with self._bus_lock:
+            self._bus.setdefault(channel, []).append(self)
+
+    def emit(self, event, data, namespace, room=None, skip_sid=None, callback=None, **kwargs):
+        message = pickle.dumps((event, data, namespace, room, skip_sid))
+        with self._bus_lock:
+            manager_list = list(self._bus.get(self.channel, ()))
+
+        for manager in manager_list:
+            if manager is self:
+                super().emit(event, data, namespace, room=room, skip_sid=skip_sid, callback=callback, **kwargs)
+            else:
+                manager.receive(message)
+
+    def receive(self, message):
+        """Boshqa serverdan kelgan emit - faqat shu serverdagi clientlarga yuboriladi"""
+        event, data, namespace, room, skip_sid = pickle.loads(message)
+        super().emit(event, data, namespace, room=room, skip_sid=skip_sid)
+
+def socketio_queue_options(message_queue, channel=SOCKETIO_CHANNEL):
+    """
+    SocketIO(...) uchun message queue parametrlari.
+    - None / ""      -> bitta process (eski holat)
+    - "local://"     -> process ichidagi bus (test uchun, LocalBusManager)
+    - "redis://..."  -> Redis (yoki Flask-SocketIO qo'llaydigan boshqa URL:
+                        rediss://, kafka://, zmq+tcp://, amqp://)
+    """
+    if not message_queue:
+        return {}
+
+    if message_queue.startswith("local://"):
+        return {"client_manager": LocalBusManager(channel=channel)}
+
+    return {
+        "message_queue": message_queue,
+        "channel": channel
+    }
@@ -0,0 +1,231 @@
+from models import db
+from sqlalchemy import func, and_, case, tuple_
+from models.user import User
+from models.support_ticket import SupportTicket
+from models.support_message import SupportMessage
+
+def build_ticket_list(viewer_role, student_id=None, include_student=False, ticket_id_list=None):
+    """
+    Ticketlar ro'yxatini BITTA query bilan quradi:
+    ticket + student + o'qilmagan xabarlar soni + oxirgi xabar.
+    O'qilmaganlar soni va oxirgi xabar ticketning o'zida saqlanadi,
+    shuning uchun support_message jadvali skan qilinmaydi.
+    Ticketlar oxirgi xabar vaqti bo'yicha sort qilinadi (Telegram logikasi).
+
+    viewer_role - inbox kim uchun ("SUPPORT" yoki "STUDENT")
+    """
+
+    query = (
+        db.session.query(SupportTicket, User, SupportMessage)
+        .outerjoin(User, and_(User.id == SupportTicket.student_id, User.role == "STUDENT"))
+        .outerjoin(SupportMessage, SupportMessage.id == SupportTicket.last_message_id)
+    )
+
+    if student_id is not None:
+        query = query.filter(SupportTicket.student_id == student_id)
+    if ticket_id_list is not None:
+        query = query.filter(SupportTicket.id.in_(ticket_id_list))
+
+    rows = query.order_by(
+        SupportTicket.last_message_at.desc().nullslast(),
+        SupportTicket.updated_at.desc()
+    ).all()
+
+    result = []
+    unread_total = 0
+
+    for ticket, student, last_message in rows:
+        if viewer_role == "SUPPORT":
+            unread = ticket.unread_for_support
+        else:
+            unread = ticket.unread_for_student
+        unread_total += unread
+
+        ticket_dict = SupportTicket.to_dict(ticket)
+        if last_message:
+            ticket_dict["last_message"] = message_to_dict(ticket, last_message)
+
+        if include_student:
+            ticket_dict["student"] = User.to_dict(student) if student else None
+
+        ticket_dict["unread_count"] = unread
+        result.append(ticket_dict)
+
+    return {
+        "unread_count": unread_total,
+        "tickets": result
+    }
+
+MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 200
+
+def get_message_page(ticket_id, before_id=None, limit=None):
+    """
+    Ticket xabarlari tarixi sahifalab (eng yangi sahifa birinchi).
+    before_id berilsa shu xabardan oldingi xabarlar qaytadi.
+    Sahifa ichida xabarlar eskidan yangiga tartiblangan (chat ko'rinishi).
+    (xabarlar, next_before_id) qaytaradi - boshqa sahifa bo'lmasa None.
+    (ticket_id, created_at) indeksi ishlatiladi.
+    """
+    if limit is None or limit <= 0:
+        limit = MESSAGE_PAGE_SIZE
+    limit = min(limit, MAX_MESSAGE_PAGE_SIZE)
+
+    query = SupportMessage.query.filter(SupportMessage.ticket_id == ticket_id)
+    if before_id:
+        before_created_at = (
+            db.session.query(SupportMessage.created_at)
+            .filter(SupportMessage.id == before_id)
+            .scalar_subquery()
+        )
+        query = query.filter(
+            tuple_(SupportMessage.created_at, SupportMessage.id) < tuple_(before_created_at, before_id)
+        )
+
+    message_list = query.order_by(
+        SupportMessage.created_at.desc(),
+        SupportMessage.id.desc()
+    ).limit(limit + 1).all()
+
+    next_before_id = None
+    if len(message_list) > limit:
+        message_list = message_list[:limit]
+        next_before_id = message_list[-1].id
+
+    message_list.reverse()
+    return message_list, next_before_id
+
+def get_ticket_list_for_support():
+    """SUPPORT inbox (barcha ticketlar)"""
+    return build_ticket_list("SUPPORT", include_student=True)
+
+def get_ticket_list_for_student(student_id):
+    """STUDENT inbox (faqat o'z ticketlari)"""
+    return build_ticket_list("STUDENT", student_id=student_id)
+
+def get_ticket_summaries_for_support(ticket_id_list):
+    """SUPPORT inbox uchun o'zgargan ticketlar (inbox_delta eventi uchun)"""
+    return build_ticket_list("SUPPORT", ticket_id_list=ticket_id_list, include_student=True)["tickets"]
+
+def message_to_dict(ticket, message):
+    """
+    Xabarni dict ga o'giradi. is_read ticketdagi o'qilganlik
+    chegarasidan (support_read_up_to / student_read_up_to) olinadi -
+    support_message.is_read ustuni endi yozilmaydi.
+    Barcha payloadlar (tarix, inbox, socket eventlari) shu funksiyadan foydalanadi.
+    """
+    if message.sender_role == "STUDENT":
+        read_up_to = ticket.support_read_up_to
+    else:
+        read_up_to = ticket.student_read_up_to
+
+    message_dict = SupportMessage.to_dict(message)
+    message_dict["is_read"] = message.id <= (read_up_to or 0)
+    return message_dict
+
+def message_list_to_dict(ticket, message_list):
+    """Xabarlar ro'yxati uchun message_to_dict"""
+    return [message_to_dict(ticket, message) for message in message_list]
+
+def get_support_unread_total():
+    """SUPPORT uchun o'qilmagan xabarlar umumiy soni"""
+    return db.session.query(
+        func.coalesce(func.sum(SupportTicket.unread_for_support), 0)
+    ).scalar()
+
+def record_new_message(ticket, message):
+    """
+    Yangi xabar bo'yicha ticket counterlari va oxirgi xabar ko'rsatkichini
+    yangilaydi. Commit chaqiruvchi tomonidan (xabar bilan bitta tranzaksiyada).
+    """
+    if message.id is None:
+        db.session.flush()
+
+    if message.sender_role == "STUDENT":
+        ticket.unread_for_support = SupportTicket.unread_for_support + 1
+    else:
+        ticket.unread_for_student = SupportTicket.unread_for_student + 1
+
+    ticket.last_message_id = message.id
+    ticket.last_message_at = message.created_at
+    return None
+
+def unread_count_subquery(sender_condition, read_up_to):
+    """Ticketdagi read_up_to dan keyingi qarshi tomon xabarlari soni (correlated)"""
+    return (
+        db.session.query(func.count(SupportMessage.id))
+        .filter(
+            SupportMessage.ticket_id == SupportTicket.id,
+            sender_condition,
+            SupportMessage.id > read_up_to
+        )
+        .scalar_subquery()
+    )
+
+def apply_read_receipts(reader_role, read_up_to_map):
+    """
+    Bir nechta ticket uchun o'qilganlik chegarasini BITTA UPDATE bilan
+    yangilaydi: {ticket_id: message_id}. Xabar qatorlari o'zgartirilmaydi.
+    Chegara orqaga qaytmaydi, counter chegaradan keyingi xabarlar soniga teng.
+    Commit chaqiruvchi tomonidan.
+    """
+    if not read_up_to_map:
+        return 0
+
+    if reader_role == "STUDENT":
+        read_up_to_column = SupportTicket.student_read_up_to
+        unread_column = SupportTicket.unread_for_student
+        sender_condition = SupportMessage.sender_role != "STUDENT"
+    else:
+        read_up_to_column = SupportTicket.support_read_up_to
+        unread_column = SupportTicket.unread_for_support
+        sender_condition = SupportMessage.sender_role == "STUDENT"
+
+    requested_read_up_to = case(read_up_to_map, value=SupportTicket.id)
+    new_read_up_to = case(
+        (read_up_to_column >= requested_read_up_to, read_up_to_column),
+        else_=requested_read_up_to
+    )
+    new_unread = case(
+        (SupportTicket.last_message_id <= new_read_up_to, 0),
+        else_=unread_count_subquery(sender_condition, new_read_up_to)
+    )
+
+    return SupportTicket.query.filter(
+        SupportTicket.id.in_(list(read_up_to_map))
+    ).update(
+        {
+            read_up_to_column: new_read_up_to,
+            unread_column: new_unread
+        },
+        synchronize_session=False
+    )
+
+def recount_ticket_counters(ticket_id_list=None):
+    """
+    Counterlar va oxirgi xabarni support_message dan qaytadan hisoblaydi
+    (bitta UPDATE). ticket_id_list berilmasa barcha ticketlar uchun.
+    """
+
+    last_message_query = (
+        db.session.query(SupportMessage)
+        .filter(SupportMessage.ticket_id == SupportTicket.id)
+        .order_by(SupportMessage.created_at.desc(), SupportMessage.id.desc())
+        .limit(1)
+    )
+
+    query = SupportTicket.query
+    if ticket_id_list is not None:
+        if not ticket_id_list:
+            return 0
+        query = query.filter(SupportTicket.id.in_(ticket_id_list))
+
+    return query.update(
+        {
+            SupportTicket.unread_for_support: unread_count_subquery(SupportMessage.sender_role == "STUDENT", SupportTicket.support_read_up_to),
+            SupportTicket.unread_for_student: unread_count_subquery(SupportMessage.sender_role != "STUDENT", SupportTicket.student_read_up_to),
+            SupportTicket.last_message_id: last_message_query.with_entities(SupportMessage.id).scalar_subquery(),
+            SupportTicket.last_message_at: last_message_query.with_entities(SupportMessage.created_at).scalar_subquery()
+        },
+        synchronize_session=False
+    )
@@ -0,0 +1,69 @@
+import time
+from threading import Lock
+
+TYPING_EMIT_INTERVAL = 2
+TYPING_EXPIRE_AFTER = 5
+
+class TypingThrottle:
+    """
+    (user, ticket) bo'yicha typing holati.
+    Ketma-ket kelgan typing eventlari interval ichida bitta emitga birlashtiriladi,
+    stop_typing kelmasa ham holat expire_after soniyadan keyin o'chadi.
+    """
+
+    def __init__(self, emit_interval, expire_after):
+        self.emit_interval = emit_interval
+        self.expire_after = expire_after
+        self.emitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.expired = 0
+        self._data = {}
+        self._lock = Lock()
+
+    def start(self, user_id, ticket_id, role):
+        """Typing keldi - room ga yuborish kerak bo'lsa True"""
+        key = (user_id, ticket_id)
+        now = time.time()
+
+        with self._lock:
+            state = self._data.get(key)
+            if state and now - state[0] < self.emit_interval:
+                state[1] = now + self.expire_after
+                self.coalesced += 1
+                return False
+
+            self._data[key] = [now, now + self.expire_after, role]
+            self.emitted += 1
+        return True
+
+    def stop(self, user_id, ticket_id):
+        """stop_typing keldi - user haqiqatan yozayotgan bo'lsa True"""
+        with self._lock:
+            if self._data.pop((user_id, ticket_id), None) is None:
+                self.dropped += 1
+                return False
+        return True
+
+    def pop_expired(self):
+        """Muddati o'tgan typing holatlari: [((user_id, ticket_id), role), ...]"""
+        now = time.time()
+        with self._lock:
+            expired = [(key, state[2]) for key, state in self._data.items() if state[1] <= now]
+            for key, role in expired:
+                del self._data[key]
+            self.expired += len(expired)
+        return expired
+
+    def stats(self):
+        with self._lock:
+            _ = {
+                "size": len(self._data),
+                "emitted": self.emitted,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "expired": self.expired
+            }
+        return _
+
+typing_throttle = TypingThrottle(TYPING_EMIT_INTERVAL, TYPING_EXPIRE_AFTER)
@@ -1,11 +1,37 @@
-def get_response(message, result, status_code):
+from flask import make_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def get_response(message, result, status_code, next_cursor=None):
     _ = {
         "message": message,
         "result": result,
         "status_code": status_code
     }
+    if next_cursor is not None:
+        _["next_cursor"] = next_cursor
     return _
 
+def output_json(data, code, headers=None):
+    """
+    flask-restful uchun tezkor JSON representation (get_response javoblari).
+    orjson o'rnatilgan bo'lsa u ishlatiladi (datetime to'g'ridan-to'g'ri ISO formatda),
+    aks holda flask-restful ning standart output_json i.
+    """
+    if orjson is None:
+        from flask_restful.representations.json import output_json as default_output_json
+        return default_output_json(data, code, headers)
+
+    dumped = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+    response = make_response(dumped, code)
+    response.headers.extend(headers or {})
+    response.headers["Content-Type"] = "application/json"
+    return response
+
 def super_admin_create():
     from models import db
     from models.user import User